@@ -0,0 +1,214 @@
+import datetime
+import logging
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from core.dispatch import post_bulk_create, pre_bulk_update
+
+from .models import AuditedItem
+
+AUDITED_MODELS = getattr(
+    settings,
+    "AUDITED_MODELS",
+    [
+        "result_system.Result",
+        "result_system.Assessment",
+        "result_system.Course",
+        "result_system.Enrollment",
+    ],
+)
+# Bookkeeping columns that change on every write and say nothing by themselves
+IGNORED_FIELDS = {"id", "created_at", "updated_at"}
+BATCH_SIZE = 1000
+
+_SNAPSHOT = "_audit_snapshot"
+logger = logging.getLogger(__name__)
+_buffer = ContextVar("audit_buffer", default=None)
+
+
+def _jsonable(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _tracked_fields(model):
+    return [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname not in IGNORED_FIELDS
+    ]
+
+
+def snapshot(instance):
+    """The loaded audited field values of an instance, JSON ready"""
+    loaded = instance.__dict__
+    return {
+        name: _jsonable(loaded[name])
+        for name in _tracked_fields(instance.__class__)
+        if name in loaded
+    }
+
+
+def _diff(old, new):
+    changed = [name for name in new if name in old and old[name] != new[name]]
+    return (
+        {name: old[name] for name in changed},
+        {name: new[name] for name in changed},
+    )
+
+
+def _entry(instance, action, old_value, new_value, user=None):
+    return AuditedItem(
+        action=action,
+        user_id=getattr(user, "pk", user),
+        content_type=ContentType.objects.get_for_model(instance.__class__),
+        object_id=instance.pk,
+        old_value=old_value,
+        new_value=new_value,
+    )
+
+
+def _write(entries):
+    AuditedItem.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+
+def _committed(entries):
+    pending = _buffer.get()
+    if pending is None:
+        _write(entries)
+    else:
+        pending.extend(entries)
+
+
+def _queue(entries):
+    # Entries of a rolled back transaction are never written
+    if entries:
+        transaction.on_commit(partial(_committed, entries))
+
+
+@contextmanager
+def buffer(user=None):
+    """Collect committed audit entries and write them with one bulk_create.
+
+    ``user`` may be a callable, resolved at flush time and applied to
+    entries that were captured without one.
+    """
+    pending = []
+    token = _buffer.set(pending)
+    try:
+        yield pending
+    finally:
+        _buffer.reset(token)
+        if pending:
+            if callable(user):
+                user = user()
+            user_id = getattr(user, "pk", user)
+            if user_id is not None:
+                for entry in pending:
+                    if entry.user_id is None:
+                        entry.user_id = user_id
+            try:
+                _write(pending)
+            except DatabaseError:
+                # The audited writes are already committed; do not fail them
+                logger.exception("Could not write %d audit entries", len(pending))
+
+
+def _capture_bulk_update(sender, instances, fields, **kwargs):
+    """Audit edits written by bulk_update, diffed against the stored rows"""
+    tracked = set(_tracked_fields(sender))
+    names = [
+        name
+        for name in (sender._meta.get_field(field).attname for field in fields)
+        if name in tracked
+    ]
+    if not instances or not names:
+        return
+    pk_name = sender._meta.pk.attname
+    stored = {
+        row.pop(pk_name): row
+        for row in sender._default_manager.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).values(pk_name, *names)
+    }
+    entries = []
+    for instance in instances:
+        row = stored.get(instance.pk, {})
+        old = {name: _jsonable(value) for name, value in row.items()}
+        new = {name: _jsonable(getattr(instance, name)) for name in names}
+        old_value, new_value = _diff(old, new)
+        if new_value:
+            entries.append(_entry(instance, AuditedItem.EDIT, old_value, new_value))
+    _queue(entries)
+
+
+def _capture_bulk_create(sender, instances, **kwargs):
+    """Audit rows written by bulk_create"""
+    _queue(
+        [
+            _entry(instance, AuditedItem.CREATE, None, snapshot(instance))
+            for instance in instances
+        ]
+    )
+
+
+def _take_snapshot(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Read the stored row only when an edit is about to be written, so
+    # instances that are merely loaded cost nothing
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    names = [
+        field.attname
+        for field in sender._meta.concrete_fields
+        if field.attname not in IGNORED_FIELDS
+        and field.attname in instance.__dict__
+        and (update_fields is None or field.name in update_fields)
+    ]
+    if not names:
+        return
+    old = sender._default_manager.filter(pk=instance.pk).values(*names).first()
+    if old is not None:
+        setattr(instance, _SNAPSHOT, {name: _jsonable(old[name]) for name in names})
+
+
+def _capture_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = snapshot(instance)
+    entries = []
+    if created:
+        entries.append(_entry(instance, AuditedItem.CREATE, None, new))
+    else:
+        old, new_value = _diff(instance.__dict__.pop(_SNAPSHOT, {}), new)
+        if new_value:
+            entries.append(_entry(instance, AuditedItem.EDIT, old, new_value))
+    _queue(entries)
+
+
+def _capture_delete(sender, instance, **kwargs):
+    _queue([_entry(instance, AuditedItem.DELETE, snapshot(instance), None)])
+
+
+def connect():
+    for label in AUDITED_MODELS:
+        model = apps.get_model(label)
+        uid = f"audit:{label}"
+        pre_save.connect(_take_snapshot, sender=model, dispatch_uid=uid)
+        post_save.connect(_capture_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_capture_delete, sender=model, dispatch_uid=uid)
+        pre_bulk_update.connect(_capture_bulk_update, sender=model, dispatch_uid=uid)
+        post_bulk_create.connect(_capture_bulk_create, sender=model, dispatch_uid=uid)
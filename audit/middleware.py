@@ -0,0 +1,20 @@
+from .capture import buffer
+
+
+def _request_user(request):
+    # DRF authenticates inside the view and stores the user back on the request
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    return None
+
+
+class AuditMiddleware:
+    """Write every audit entry committed during a request in one bulk_create"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with buffer(user=lambda: _request_user(request)):
+            return self.get_response(request)
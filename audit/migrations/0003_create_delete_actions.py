@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditeditem',
+            name='action',
+            field=models.CharField(choices=[('C', 'Create'), ('E', 'Edit'), ('D', 'Delete'), ('A', 'Archive'), ('RA', 'Reactivate')], max_length=10),
+        ),
+    ]
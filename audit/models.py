@@ -5,11 +5,15 @@ from django.conf import settings
 
 
 class AuditedItem(models.Model):
+    CREATE = 'C'
     EDIT = 'E'
+    DELETE = 'D'
     ARCHIVE = 'A'
     REACTIVATE = 'RA'
     ACTION_CHOICES = [
+        (CREATE, 'Create'),
         (EDIT, 'Edit'),
+        (DELETE, 'Delete'),
         (ARCHIVE, 'Archive'),
         (REACTIVATE, 'Reactivate'),
     ]
@@ -0,0 +1,34 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import token_version, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Trust the role and scope claims of our own tokens.
+
+    The only per-request lookup is the cached token version, which makes
+    role changes, deactivation and password changes revoke old tokens.
+    Tokens issued before the claims existed fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if "token_version" not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                _("Token contained no recognizable user identification"),
+                code="token_not_valid",
+            )
+        if token_version(user_id) != validated_token["token_version"]:
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+        if not validated_token.get("is_active", True):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user_from_claims(validated_token, user_id)
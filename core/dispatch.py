@@ -0,0 +1,11 @@
+"""Signals for writes that bypass the model save and delete signals"""
+
+from django.dispatch import Signal
+
+# Sent just before QuerySet.bulk_update(instances, fields) with the model as
+# sender, while the database still holds the old values
+pre_bulk_update = Signal()
+
+# Sent after QuerySet.bulk_create(instances) with the model as sender, once
+# the instances carry their primary keys
+post_bulk_create = Signal()
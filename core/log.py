@@ -0,0 +1,135 @@
+"""Non-blocking, structured logging.
+
+Records are put on a queue by the calling thread and written by a single
+listener thread, so disk (or terminal) latency never adds to a request.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+request_id_var = ContextVar("request_id", default=None)
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+def new_request_id(candidate=None):
+    """Reuse a well-formed incoming id (e.g. from a proxy), else make one"""
+    if candidate and _REQUEST_ID.match(candidate):
+        return candidate
+    return uuid.uuid4().hex
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id, in the calling thread"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        data.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, default=str)
+
+
+class BackgroundHandler(QueueHandler):
+    """Queue records for a listener thread that writes the actual sinks.
+
+    Sinks: an append-only JSON file and, optionally, the console. Every
+    worker process appends to the same file, so it is rotated externally
+    (logrotate); WatchedFileHandler reopens it once it has been moved. The
+    listener starts on the first record in each process, so a worker forked
+    from a preloaded master (gunicorn --preload) gets its own thread.
+    """
+
+    def __init__(
+        self,
+        filename="general.log",
+        console=True,
+        console_format="{asctime} ({levelname}) [{request_id}] {name} - {message}",
+    ):
+        super().__init__(queue.SimpleQueue())
+        file_handler = WatchedFileHandler(filename, delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        self.sinks = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(console_format, style="{"))
+            self.sinks.append(console_handler)
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _start_listener(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A listener inherited through fork has no thread in this process
+            self.queue = queue.SimpleQueue()
+            self.listener = QueueListener(
+                self.queue, *self.sinks, respect_handler_level=True
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+            # Flush whatever is still queued when the process exits
+            atexit.register(self._stop_listener)
+
+    def _stop_listener(self):
+        listener = self.listener
+        if listener is not None and self._pid == os.getpid() and listener._thread:
+            self.listener.stop()
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def prepare(self, record):
+        # Render the message and traceback now (arguments may be mutated
+        # later) but keep the record structured for the JSON formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self):
+        self._stop_listener()
+        super().close()
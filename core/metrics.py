@@ -0,0 +1,80 @@
+"""Request metrics in the Prometheus text format, merged across workers.
+
+Any gunicorn worker may answer a scrape, so per-process numbers would jump
+between workers. With PROMETHEUS_MULTIPROC_DIR set (an empty directory,
+wiped before the workers start) prometheus_client keeps every process's
+samples in files there and the scrape merges them. Without it, as under
+runserver, the numbers cover the answering process only.
+"""
+
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Upper bounds of the histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LABELS = ("route", "method")
+
+
+class Registry:
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests",
+            "Requests by route, method and status",
+            LABELS + ("status",),
+        )
+        self.duration = Histogram(
+            "http_request_duration_seconds",
+            "Request latency by route",
+            LABELS,
+            buckets=LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            "http_request_db_queries",
+            "SQL queries per request by route",
+            LABELS,
+            buckets=QUERY_BUCKETS,
+        )
+        self.query_time = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent in SQL per request by route",
+            LABELS,
+            buckets=LATENCY_BUCKETS,
+        )
+        self.size = Histogram(
+            "http_response_size_bytes",
+            "Response body size by route (streaming responses excluded)",
+            LABELS,
+            buckets=SIZE_BUCKETS,
+        )
+
+    def observe_request(
+        self, route, method, status, duration, queries, query_time, size=None
+    ):
+        self.requests.labels(route, method, status).inc()
+        self.duration.labels(route, method).observe(duration)
+        self.queries.labels(route, method).observe(queries)
+        self.query_time.labels(route, method).observe(query_time)
+        if size is not None:
+            self.size.labels(route, method).observe(size)
+
+    def render(self):
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return generate_latest(registry)
+
+
+registry = Registry()
@@ -0,0 +1,69 @@
+import time
+
+from django.db import connection
+
+from .log import new_request_id, request_id_var
+from .metrics import registry
+
+UNRESOLVED_ROUTE = "<unresolved>"
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and sums their duration"""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestIdMiddleware:
+    """Tag the request's log records with an id, echoed as X-Request-ID"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.id = new_request_id(request.headers.get("X-Request-ID"))
+        token = request_id_var.set(request.id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response["X-Request-ID"] = request.id
+        return response
+
+
+class MetricsMiddleware:
+    """Record latency, SQL count/time and response size per resolved route"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        registry.observe_request(
+            route=(match.view_name or match.route) if match else UNRESOLVED_ROUTE,
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            queries=timer.queries,
+            query_time=timer.seconds,
+            size=None if response.streaming else len(response.content),
+        )
+        return response
@@ -8,6 +8,8 @@ class User(AbstractUser):
     is_dro = models.BooleanField(default=False)
     is_fro = models.BooleanField(default=False)
     is_co = models.BooleanField(default=False)
+    # Bumped whenever issued JWTs must stop working (role, status or password change)
+    token_version = models.PositiveIntegerField(default=0)
 
 
     
@@ -0,0 +1,20 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination on a stable ordering, without COUNT(*) or OFFSET scans.
+
+    Clients may ask for up to ``max_page_size`` rows with ``?page_size=``.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "id"
+
+
+class TimestampKeysetPagination(KeysetPagination):
+    ordering = ("-timestamp", "-id")
+
+
+class ModifiedAtKeysetPagination(KeysetPagination):
+    ordering = ("-modified_at", "-id")
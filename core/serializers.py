@@ -1,5 +1,21 @@
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+)
+
+from .tokens import token_claims
 
 class UserCreateSerializer(BaseUserCreateSerializer):
     class Meta(BaseUserCreateSerializer.Meta):
-       fields = ['id', 'first_name', 'last_name', 'username', 'email', 'password']
\ No newline at end of file
+       fields = ['id', 'first_name', 'last_name', 'username', 'email', 'password']
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Adds role, scope and token version claims (see core.tokens)"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in token_claims(user).items():
+            token[claim] = value
+        return token
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .tokens import REVOKING_FIELDS, revoke_tokens
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=User)
+def detect_token_revoking_change(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    instance._revoke_tokens = False
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(REVOKING_FIELDS):
+        # e.g. the last_login update on every login
+        return
+    old = User.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS).first()
+    instance._revoke_tokens = old is not None and any(
+        old[field] != getattr(instance, field) for field in REVOKING_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_after_change(sender, instance, created, **kwargs):
+    if getattr(instance, "_revoke_tokens", False):
+        instance._revoke_tokens = False
+        revoke_tokens(instance.pk)
+        instance.token_version += 1
@@ -0,0 +1,94 @@
+"""JWT claims that let requests authenticate and scope without a user query"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+# Copied into every token and onto the user rebuilt from it
+CLAIM_FIELDS = (
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_lecturer",
+    "is_dro",
+    "is_fro",
+    "is_co",
+)
+# Changing any of these invalidates the user's outstanding tokens
+REVOKING_FIELDS = CLAIM_FIELDS + ("password",)
+SCOPE_CLAIMS = ("department_id", "faculty_id")
+
+# Revocations reach other processes within this many seconds
+VERSION_CACHE_TIMEOUT = getattr(settings, "TOKEN_VERSION_CACHE_TIMEOUT", 60)
+
+
+def _version_key(user_id):
+    return f"core:token_version:{user_id}"
+
+
+def token_claims(user):
+    from result_system.models import Profile
+
+    profile = (
+        Profile.objects.filter(user_id=user.pk)
+        .values("department_id", "department__faculty_id")
+        .first()
+        or {}
+    )
+    claims = {field: getattr(user, field) for field in CLAIM_FIELDS}
+    claims.update(
+        username=user.get_username(),
+        department_id=profile.get("department_id"),
+        faculty_id=profile.get("department__faculty_id"),
+        token_version=user.token_version,
+    )
+    return claims
+
+
+def token_version(user_id):
+    """The user's current token version (None for a deleted user), cached"""
+    return cache.get_or_set(
+        _version_key(user_id),
+        lambda: get_user_model()
+        .objects.filter(pk=user_id)
+        .values_list("token_version", flat=True)
+        .first(),
+        VERSION_CACHE_TIMEOUT,
+    )
+
+
+def revoke_tokens(*user_ids):
+    """Invalidate every token issued to these users so far"""
+    if not user_ids:
+        return
+    get_user_model().objects.filter(pk__in=user_ids).update(
+        token_version=F("token_version") + 1
+    )
+    transaction.on_commit(
+        lambda: cache.delete_many([_version_key(user_id) for user_id in user_ids])
+    )
+
+
+def user_from_claims(token, user_id):
+    """Build the user from a validated token without querying the database.
+
+    Fields not carried by the token are deferred, so they load lazily if a
+    view needs them and a save() only writes the claimed fields.
+    """
+    User = get_user_model()
+    values = {
+        "id": user_id,
+        User.USERNAME_FIELD: token["username"],
+        "token_version": token["token_version"],
+        **{field: token[field] for field in CLAIM_FIELDS},
+    }
+    fields = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, [values[name] for name in fields])
+    user.token_claims = {claim: token.get(claim) for claim in SCOPE_CLAIMS}
+    return user
@@ -2,6 +2,9 @@ from django.views.generic import TemplateView
 from django.urls import path
 from rest_framework_nested.routers import DefaultRouter, NestedDefaultRouter
 
+from . import views
+
 urlpatterns = [
-    path('', TemplateView.as_view(template_name='core/index.html'), )
-]
\ No newline at end of file
+    path('', TemplateView.as_view(template_name='core/index.html'), ),
+    path('metrics/', views.metrics, name='metrics'),
+]
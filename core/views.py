@@ -1,3 +1,17 @@
+from django.http import HttpResponse
 from django.shortcuts import render
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from .metrics import registry
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """Request metrics of every worker process in the Prometheus text format"""
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE_LATEST)
+
 
 # Create your views here.
@@ -3,6 +3,17 @@ ASGI config for examination_management_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve /notification/stream/ from this application so Server-Sent Events
+streams stay open without tying up a worker, e.g.
+
+    gunicorn examination_management_system.asgi:application \
+        -k uvicorn.workers.UvicornWorker
+
+and route that path to it at the proxy, with buffering off. The WSGI
+application keeps serving the rest of the API; requests for the stream that
+reach it get the waiting events and close, so clients fall back to
+polling.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -33,34 +33,34 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "rest_framework",
     "django_filters",
     "djoser",
     "drf_spectacular",
     "corsheaders",
     # app
-    # 'audit',
+    "audit",
     "core",
     "result_system.apps.ResultSystemConfig",
     "notification",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestIdMiddleware",
+    # Early, so the timings cover every other middleware
+    "core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "audit.middleware.AuditMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-INTERNAL_IPS = ["127.0.0.1"]
-
 # CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8080",
@@ -134,12 +134,32 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Enrollment and scope caches are invalidated from model signals, so writes
+# that skip signals (bulk_create, queryset update/delete) must call the
+# module's invalidate_*() themselves. Invalidation only reaches other gunicorn
+# workers through a shared cache; without REDIS_URL every process keeps its
+# own LocMemCache and entries expire after seconds instead.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+SHARED_CACHE_TIMEOUT = 60 * 60 if REDIS_URL else 30
+MEMBERSHIP_CACHE_TIMEOUT = SHARED_CACHE_TIMEOUT
+SCOPE_CACHE_TIMEOUT = SHARED_CACHE_TIMEOUT
+
 REST_FRAMEWORK = {
     "COERCE_DECIMAL_TO_STRING": False,
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -156,6 +176,7 @@ SPECTACULAR_SETTINGS = {
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("JWT",),
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "core.serializers.TokenObtainPairSerializer",
 }
 
 DJOSER = {
@@ -168,25 +189,22 @@ DJOSER = {
 LOGGING = {
     "version": 1,  # the dictConfig format version
     "disable_existing_loggers": False,  # retain the default loggers
+    "filters": {
+        "request_id": {"()": "core.log.RequestIdFilter"},
+    },
     "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-        },
-        "file": {
-            "class": "logging.FileHandler",
-            "filename": "general.log",
+        # Request threads only enqueue; a listener thread per process appends
+        # to the JSON file (and the console). Rotate LOG_FILE with logrotate.
+        "background": {
+            "()": "core.log.BackgroundHandler",
+            "filename": config("LOG_FILE", "general.log"),
+            "filters": ["request_id"],
         },
     },
     "loggers": {
         "": {
-            "handlers": ["console", "file"],
+            "handlers": ["background"],
             "level": config("DJANGO_LEVEL_LOG", "INFO"),
         },
     },
-    "formatters": {
-        "verbose": {
-            "format": "{asctime} ({levelname}) - {name} - {message}",
-            "style": "{",
-        }
-    },
 }
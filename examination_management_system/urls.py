@@ -15,7 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-import debug_toolbar
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import (
@@ -27,7 +27,6 @@ from drf_spectacular.views import (
 urlpatterns = [
     path("", include("core.urls")),
     path("admin/", admin.site.urls),
-    path("_debug_/", include(debug_toolbar.urls)),
     path("result-system/", include("result_system.urls")),
     path("notification/", include("notification.urls")),
     path("auth/", include("djoser.urls")),
@@ -45,3 +44,6 @@ urlpatterns = [
         name="redoc",
     ),
 ]
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("_debug_/", include("debug_toolbar.urls")))
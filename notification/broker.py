@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+QUEUE_SIZE = getattr(settings, "NOTIFICATION_STREAM_QUEUE_SIZE", 100)
+
+
+class Subscription:
+    """One open stream's mailbox, owned by the event loop that created it"""
+
+    def __init__(self, user_id, loop, maxsize=QUEUE_SIZE):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        # Set when events were dropped; the stream then reloads from the database
+        self.lagged = False
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+    def deliver(self, event):
+        # Publishers run in worker threads, so hand the event to the owning loop
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop has been closed under us; nothing is listening any more
+            pass
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class NotificationBroker:
+    """In-process pub/sub from committed notifications to open streams.
+
+    Only streams served by this process see the events. Notifications
+    created by other processes (the WSGI workers, in the usual deployment)
+    reach a stream when it rereads the database on each keepalive, and
+    clients reconnecting with ``Last-Event-ID`` pick up anything they missed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscriptions.get(user_id, ()))
+            return sum(map(len, self._subscriptions.values()))
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+
+broker = NotificationBroker()
+
+
+def notification_event(notification):
+    """SSE payload for a notification; None asks the stream to reload.
+
+    Backends that do not return ids from bulk_create (MySQL) leave ``pk``
+    unset, in which case subscribers catch up from the database instead.
+    """
+    from .serializers import NotificationSerializer
+
+    if notification.pk is None:
+        return None
+    return {"id": notification.pk, "data": NotificationSerializer(notification).data}
+
+
+def publish_on_commit(notifications):
+    """Push the notifications to their recipients' streams once committed"""
+    notifications = list(notifications)
+    if not notifications:
+        return
+
+    def publish():
+        for notification in notifications:
+            if broker.subscriber_count(notification.recipient_id):
+                broker.publish(
+                    notification.recipient_id, notification_event(notification)
+                )
+
+    transaction.on_commit(publish)
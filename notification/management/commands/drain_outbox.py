@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notification.outbox import BATCH_SIZE, dispatch_pending
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound emails in batches, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when the outbox is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain everything that is currently due, then exit",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            sent, failed = dispatch_pending(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            if sent + failed < batch_size:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from notification.utils import BATCH_SIZE, reconcile_unread
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount unread notifications and correct UnreadCounter rows that "
+        "drifted, e.g. after raw SQL or queryset updates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            type=int,
+            help="Only reconcile this user id (repeatable)",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        corrected = reconcile_unread(options["users"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{corrected} unread counters corrected"))
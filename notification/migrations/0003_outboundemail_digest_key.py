@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='digest_key',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    Notification = apps.get_model("notification", "Notification")
+    UnreadCounter = apps.get_model("notification", "UnreadCounter")
+    UnreadCounter.objects.bulk_create(
+        [
+            UnreadCounter(user_id=row["recipient_id"], unread=row["unread"])
+            for row in Notification.objects.filter(is_read=False)
+            .values("recipient_id")
+            .annotate(unread=models.Count("id"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_is_co'),
+        ('notification', '0004_notification_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notifications', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
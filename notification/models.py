@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -25,8 +26,73 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Recipient feed, newest first
+            models.Index(
+                fields=["recipient", "-timestamp"], name="notification_feed_idx"
+            ),
+            models.Index(
+                fields=["recipient"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
+        ]
+
     def __str__(self):
         return f'{self.actor} {self.verb} {self.content_object} -> {self.recipient}'
 
 
+class UnreadCounter(models.Model):
+    """Unread notification count per user.
+
+    Kept in step by notification.utils and notification.signals; writes that
+    bypass both are repaired with the reconcile_unread command.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_notifications",
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.unread} unread"
+
+
+class OutboundEmail(models.Model):
+    """Templated email written in the caller's transaction and sent by a worker"""
+
+    STATUS_PENDING = "P"
+    STATUS_SENT = "S"
+    STATUS_FAILED = "F"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict)
+    # Emails sharing a digest key are merged while still pending
+    digest_key = models.CharField(max_length=255, blank=True, db_index=True)
+    to = models.JSONField()
+    status = models.CharField(
+        max_length=1, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.template_name} -> {', '.join(self.to)} ({self.get_status_display()})"
+
+
 # Create your models here.
@@ -0,0 +1,138 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+from templated_mail.mail import BaseEmailMessage
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "EMAIL_OUTBOX_BATCH_SIZE", 50)
+MAX_ATTEMPTS = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5)
+RETRY_DELAY = getattr(settings, "EMAIL_OUTBOX_RETRY_DELAY", 30)  # seconds
+MAX_RETRY_DELAY = getattr(settings, "EMAIL_OUTBOX_MAX_RETRY_DELAY", 60 * 60)
+
+
+def enqueue_email(template_name, context, to):
+    """Queue a templated email; it is sent by the drain_outbox worker.
+
+    The row joins the caller's transaction, so nothing is sent for work that
+    is rolled back. ``context`` must be JSON serialisable.
+    """
+    return OutboundEmail.objects.create(
+        template_name=template_name, context=context, to=list(to)
+    )
+
+
+def enqueue_digest(template_name, digest_key, to, context, entries, window=0):
+    """Queue ``entries`` under ``context["entries"]`` for a digest email.
+
+    With a ``window`` (seconds), the email is held back that long and any
+    entries queued for the same digest key in the meantime are appended to it
+    instead of producing another email. A digest locked by a drain worker
+    mid-send is skipped rather than waited for, and a new one is started.
+    """
+    with transaction.atomic():
+        if window:
+            pending = (
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    digest_key=digest_key,
+                    status=OutboundEmail.STATUS_PENDING,
+                    attempts=0,
+                )
+                .first()
+            )
+            if pending is not None:
+                pending.context["entries"].extend(entries)
+                pending.save(update_fields=["context"])
+                return pending
+        return OutboundEmail.objects.create(
+            template_name=template_name,
+            digest_key=digest_key,
+            context={**context, "entries": list(entries)},
+            to=list(to),
+            next_attempt_at=timezone.now() + timedelta(seconds=window),
+        )
+
+
+def retry_delay(attempts):
+    """Exponential backoff: RETRY_DELAY, 2x, 4x ... capped at MAX_RETRY_DELAY"""
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def _record_failure(email, error):
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboundEmail.STATUS_FAILED
+        logger.error(
+            "Giving up on outbound email %s after %s attempts",
+            email.id,
+            email.attempts,
+            exc_info=True,
+        )
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        logger.warning(
+            "Outbound email %s failed, retrying at %s",
+            email.id,
+            email.next_attempt_at,
+        )
+
+
+def dispatch_pending(batch_size=BATCH_SIZE):
+    """Send one batch of due emails. Returns (sent, failed) counts.
+
+    Rows are locked with SKIP LOCKED so several workers can drain the
+    outbox concurrently; one mail connection is reused for the batch.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=OutboundEmail.STATUS_PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not batch:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # Mail server unreachable: every claimed row backs off, and the
+            # worker keeps running
+            for email in batch:
+                email.attempts += 1
+                _record_failure(email, e)
+            failed = len(batch)
+        else:
+            with connection:
+                for email in batch:
+                    email.attempts += 1
+                    try:
+                        message = BaseEmailMessage(
+                            template_name=email.template_name, context=email.context
+                        )
+                        message.connection = connection
+                        message.send(email.to)
+                    except Exception as e:
+                        failed += 1
+                        _record_failure(email, e)
+                    else:
+                        sent += 1
+                        email.status = OutboundEmail.STATUS_SENT
+                        email.sent_at = timezone.now()
+                        email.last_error = ""
+
+        OutboundEmail.objects.bulk_update(
+            batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return sent, failed
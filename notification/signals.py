@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .utils import adjust_unread
+
+# notify_many and mark_read keep the counters themselves with bulk writes,
+# which send no signals; these cover single saves and deletes (admin,
+# Notification.objects.create, cascades)
+
+
+@receiver(pre_save, sender=Notification, weak=False)
+def remember_read_state(sender, instance, raw=False, **kwargs):
+    instance._was_unread = None
+    if raw or instance._state.adding:
+        return
+    instance._was_unread = (
+        Notification.objects.filter(pk=instance.pk, is_read=False).exists()
+    )
+
+
+@receiver(post_save, sender=Notification, weak=False)
+def count_saved_notification(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    is_unread = not instance.is_read
+    was_unread = False if created else getattr(instance, "_was_unread", None)
+    if was_unread is not None and was_unread != is_unread:
+        adjust_unread(instance.recipient_id, 1 if is_unread else -1)
+
+
+@receiver(post_delete, sender=Notification, weak=False)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.recipient_id, -1)
@@ -1,9 +1,12 @@
 from django.urls import path
 from rest_framework_nested.routers import DefaultRouter
 
-from .views import NotificationViewset
+from .views import NotificationViewset, notification_stream
 
 router = DefaultRouter()
 router.register("", NotificationViewset, basename="notification")
 
-urlpatterns = router.urls
+urlpatterns = [
+    # Before the router, whose detail route would otherwise match "stream/"
+    path("stream/", notification_stream, name="notification-stream"),
+] + router.urls
@@ -1,18 +1,155 @@
+from itertools import product
+
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .broker import publish_on_commit
+from .models import Notification, UnreadCounter
+
+BATCH_SIZE = 1000
+
+
+def _as_list(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+def _increment_unread(user_ids, count):
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    UnreadCounter.objects.filter(user_id__in=user_ids).update(
+        unread=F("unread") + count
+    )
+
+
+def _decrement_unread(user_id, count):
+    UnreadCounter.objects.filter(user_id=user_id).update(
+        unread=Greatest(F("unread") - count, 0)
+    )
+
 
-from .models import Notification
+def adjust_unread(user_id, delta):
+    """Move one user's counter, for writes that bypass notify_many/mark_read"""
+    if delta > 0:
+        _increment_unread([user_id], delta)
+    elif delta < 0:
+        _decrement_unread(user_id, -delta)
+
+
+def reconcile_unread(user_ids=None, batch_size=BATCH_SIZE):
+    """Recount unread notifications and rewrite the drifted counters.
+
+    Covers every user, or only ``user_ids``. Returns the number of counters
+    corrected.
+    """
+    users = get_user_model().objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    actual = users.annotate(
+        counted=Count(
+            "notification_recipient",
+            filter=Q(notification_recipient__is_read=False),
+        )
+    ).values_list("pk", "counted")
+    stored = {
+        counter.user_id: counter
+        for counter in UnreadCounter.objects.filter(user__in=users)
+    }
+    created, changed = [], []
+    for user_id, counted in actual.iterator(chunk_size=batch_size):
+        counter = stored.get(user_id)
+        if counter is None:
+            # Without a counter unread_count() counts the rows itself
+            if counted:
+                created.append(UnreadCounter(user_id=user_id, unread=counted))
+        elif counter.unread != counted:
+            counter.unread = counted
+            changed.append(counter)
+    with transaction.atomic():
+        UnreadCounter.objects.bulk_create(created, batch_size=batch_size)
+        UnreadCounter.objects.bulk_update(changed, ["unread"], batch_size=batch_size)
+    return len(created) + len(changed)
+
+
+def notify_many(
+    recipients, actor, verb, targets, target_url=None, batch_size=BATCH_SIZE
+):
+    """Notify every recipient about every target with a single INSERT.
+
+    ``recipients`` and ``actor`` may be users or user ids, ``targets`` one model
+    instance or several. Content types come from ContentType's in-process cache,
+    so a warm process only queries for the insert and the recipients' unread
+    counters. Open notification streams receive the rows once the transaction
+    commits. Returns the created notifications.
+    """
+    recipient_ids = list(
+        dict.fromkeys(
+            getattr(recipient, "pk", recipient) for recipient in _as_list(recipients)
+        )
+    )
+    targets = _as_list(targets)
+    if not recipient_ids or not targets:
+        return []
+
+    content_types = ContentType.objects.get_for_models(
+        *{target.__class__ for target in targets}
+    )
+    actor_id = getattr(actor, "pk", actor)
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    recipient_id=recipient_id,
+                    actor_id=actor_id,
+                    verb=verb,
+                    content_type=content_types[target.__class__],
+                    object_id=target.pk,
+                    target_url=target_url,
+                )
+                for recipient_id, target in product(recipient_ids, targets)
+            ],
+            batch_size=batch_size,
+        )
+        _increment_unread(recipient_ids, len(targets))
+    publish_on_commit(notifications)
+    return notifications
 
 
 def notify(recipient, actor, verb, target_instance):
-    content_type = ContentType.objects.get_for_model(target_instance.__class__)
-    object_id = target_instance.pk
+    """``recipient`` and ``actor`` may be users or user ids"""
+    return notify_many([recipient], actor, verb, [target_instance])[0]
 
-    print("notification created")
 
-    return Notification.objects.create(
-        recipient=recipient,
-        actor=actor,
-        verb=verb,
-        content_type=content_type,
-        object_id=object_id,
+def unread_count(user):
+    """The user's unread notification count, a primary key lookup"""
+    unread = (
+        UnreadCounter.objects.filter(user=user)
+        .values_list("unread", flat=True)
+        .first()
     )
+    if unread is None:
+        # No counter yet: only rows created outside notify_many can be unread
+        unread = Notification.objects.filter(recipient=user, is_read=False).count()
+    return unread
+
+
+def mark_read(user, ids=None):
+    """Mark the given (or all) unread notifications of a user read.
+
+    One UPDATE over the unread partial index plus one counter update,
+    whatever the backlog size. Returns the number of notifications marked.
+    """
+    with transaction.atomic():
+        unread = Notification.objects.filter(recipient=user, is_read=False)
+        if ids is not None:
+            unread = unread.filter(id__in=ids)
+        marked = unread.update(is_read=True)
+        if marked:
+            _decrement_unread(user.pk, marked)
+    return marked
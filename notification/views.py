@@ -1,17 +1,226 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from rest_framework.decorators import action
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from core.authentication import ClaimsJWTAuthentication
+from core.pagination import TimestampKeysetPagination
+from core.tokens import token_version
 
+from .broker import broker
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import MarkReadSerializer, NotificationSerializer
+from .utils import mark_read, unread_count
+
+STREAM_KEEPALIVE = getattr(settings, "NOTIFICATION_STREAM_KEEPALIVE", 15)  # seconds
+STREAM_RETRY = getattr(settings, "NOTIFICATION_STREAM_RETRY", 3000)  # milliseconds
+STREAM_BACKLOG = getattr(settings, "NOTIFICATION_STREAM_BACKLOG", 100)
+STREAM_TICKET_MAX_AGE = getattr(settings, "NOTIFICATION_STREAM_TICKET_MAX_AGE", 60)
+STREAM_TICKET_SALT = "notification.stream"
 
 
 class NotificationViewset(ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
+    pagination_class = TimestampKeysetPagination
 
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user).order_by(
             "-timestamp"
         )
 
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        return Response({"unread": unread_count(request.user)})
+
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked = mark_read(request.user, serializer.validated_data["ids"])
+        return Response({"marked": marked, "unread": unread_count(request.user)})
+
+    @action(detail=False, methods=["post"], url_path="mark-all-read")
+    def mark_all_read(self, request):
+        marked = mark_read(request.user)
+        return Response({"marked": marked, "unread": unread_count(request.user)})
+
+    @action(detail=False, methods=["post"], url_path="stream-ticket")
+    def stream_ticket(self, request):
+        """Short-lived ticket for opening the stream with ?ticket=.
+
+        EventSource cannot send an Authorization header, and a JWT in the
+        query string would end up in access and proxy logs.
+        """
+        return Response(
+            {"ticket": _issue_ticket(request.user), "expires_in": STREAM_TICKET_MAX_AGE}
+        )
+
+
+def _issue_ticket(user):
+    return signing.dumps(
+        {"user": user.pk, "version": getattr(user, "token_version", None)},
+        salt=STREAM_TICKET_SALT,
+        compress=True,
+    )
+
+
+def _user_id_from_ticket(ticket):
+    """The user id of a valid, unexpired stream ticket, otherwise None"""
+    try:
+        payload = signing.loads(
+            ticket, salt=STREAM_TICKET_SALT, max_age=STREAM_TICKET_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    # Revoking a user's tokens also invalidates their outstanding tickets
+    if token_version(payload["user"]) != payload["version"]:
+        return None
+    return payload["user"]
+
+
+def _authenticate(request):
+    """The id of the user opening the stream, or None"""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return _user_id_from_ticket(ticket)
+    authentication = ClaimsJWTAuthentication()
+    try:
+        result = authentication.authenticate(request)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return result[0].pk if result else None
+
+
+def _last_event_id(request):
+    value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _latest_id(user_id):
+    return (
+        Notification.objects.filter(recipient_id=user_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+        or 0
+    )
+
+
+def _missed_events(user_id, last_id):
+    notifications = Notification.objects.filter(
+        recipient_id=user_id, id__gt=last_id
+    ).order_by("id")[:STREAM_BACKLOG]
+    return [
+        {"id": notification.pk, "data": data}
+        for notification, data in zip(
+            notifications, NotificationSerializer(notifications, many=True).data
+        )
+    ]
+
+
+def _format_event(event):
+    data = json.dumps(event["data"])
+    return f"id: {event['id']}\nevent: notification\ndata: {data}\n\n"
+
+
+async def _event_stream(user_id, last_id):
+    # Subscribe before reading the database so nothing committed in between is lost
+    subscription = broker.subscribe(user_id)
+    try:
+        yield f"retry: {STREAM_RETRY}\n\n"
+        if last_id is None:
+            last_id = await sync_to_async(_latest_id)(user_id)
+            reload = False
+        else:
+            reload = True
+        # Resuming from here matters if the connection drops before any event
+        yield f"id: {last_id}\n\n"
+
+        while True:
+            if reload or subscription.lagged:
+                subscription.lagged = False
+                while True:
+                    missed = await sync_to_async(_missed_events)(user_id, last_id)
+                    for event in missed:
+                        last_id = event["id"]
+                        yield _format_event(event)
+                    if len(missed) < STREAM_BACKLOG:
+                        break
+                reload = False
+
+            try:
+                event = await subscription.get(timeout=STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                # The broker only sees this process's notifications; the
+                # database catches the ones created by other workers
+                reload = True
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                reload = True
+            elif event["id"] > last_id:
+                last_id = event["id"]
+                yield _format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _poll_stream(user_id, last_id):
+    """Poll fallback for WSGI workers, which cannot hold a stream open.
+
+    Sends whatever is already waiting and closes at once, so the worker is
+    free again; EventSource reconnects with Last-Event-ID after STREAM_RETRY
+    milliseconds.
+    """
+    yield f"retry: {STREAM_RETRY}\n\n"
+    if last_id is None:
+        last_id = _latest_id(user_id)
+    yield f"id: {last_id}\n\n"
+    for event in _missed_events(user_id, last_id):
+        yield _format_event(event)
+
+
+async def notification_stream(request):
+    """Server-Sent Events feed of the user's new notifications.
+
+    Open it with a ticket from ``stream-ticket/`` as ``?ticket=`` (or an
+    Authorization header). Reconnecting clients send ``Last-Event-ID`` (or
+    ``?last_event_id=``) and get everything after it from the database
+    before live events resume.
+
+    Served through ASGI (see asgi.py) the stream stays open. Served through
+    WSGI it returns the waiting events and closes, leaving the client to poll
+    every STREAM_RETRY milliseconds, because a WSGI worker would read a
+    never-ending stream to the end and stay tied up.
+    """
+    user_id = await sync_to_async(_authenticate)(request)
+    if user_id is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    last_id = _last_event_id(request)
+    if isinstance(request, ASGIRequest):
+        stream = _event_stream(user_id, last_id)
+    else:
+        stream = _poll_stream(user_id, last_id)
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 
 # Create your views here.
@@ -0,0 +1,61 @@
+from django.db import transaction
+
+from core.dispatch import post_bulk_create
+
+from .grading import INCOMPLETE_GRADE
+from .membership import enrolled_student_ids
+from .models import Assessment, Enrollment
+
+BATCH_SIZE = 1000
+
+
+def result_student_ids(result):
+    """Ids of the students enrolled for a result's course (and term, if set)"""
+    if result.academic_year is None and not result.semester:
+        return enrolled_student_ids(result.course_id)
+    enrollments = Enrollment.objects.filter(course_id=result.course_id)
+    if result.academic_year is not None:
+        enrollments = enrollments.filter(academic_year=result.academic_year)
+    if result.semester:
+        enrollments = enrollments.filter(semester=result.semester)
+    return frozenset(enrollments.values_list("student_id", flat=True))
+
+
+def sync_assessments(result, batch_size=BATCH_SIZE):
+    """Create the assessments a result is missing, using ids only.
+
+    Returns (created student ids, ids of assessments whose student is no
+    longer enrolled). Orphaned assessments are reported, never deleted.
+    """
+    enrolled = result_student_ids(result)
+    existing = dict(
+        Assessment.objects.filter(result_id=result.pk).values_list("student_id", "id")
+    )
+    missing = sorted(enrolled - existing.keys())
+    for start in range(0, len(missing), batch_size):
+        _create_assessments(result, missing[start : start + batch_size])
+    orphaned = sorted(
+        assessment_id
+        for student_id, assessment_id in existing.items()
+        if student_id not in enrolled
+    )
+    return missing, orphaned
+
+
+def _create_assessments(result, student_ids):
+    # ignore_conflicts leaves the new instances without primary keys, so the
+    # rows are read back for the post_bulk_create receivers
+    with transaction.atomic():
+        Assessment.objects.bulk_create(
+            [
+                Assessment(
+                    result_id=result.pk, student_id=student_id, grade=INCOMPLETE_GRADE
+                )
+                for student_id in student_ids
+            ],
+            ignore_conflicts=True,
+        )
+        created = list(
+            Assessment.objects.filter(result_id=result.pk, student_id__in=student_ids)
+        )
+        post_bulk_create.send(sender=Assessment, instances=created)
@@ -0,0 +1,380 @@
+"""In-process API benchmarks: scripted scenarios against the real endpoints"""
+
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.serializers import TokenObtainPairSerializer
+from notification.models import Notification
+
+from .models import Assessment, Result
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Step:
+    name: str
+    method: str
+    # Path and payload templates are formatted with the scenario context
+    path: str
+    data: object = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    steps: list
+    # Returns the context (user plus path values) or None when the data is missing
+    resolve: object = None
+
+
+@dataclass
+class Sample:
+    milliseconds: float
+    queries: int
+    rows: int
+    status: int
+    size: int
+
+
+@dataclass
+class Measurements:
+    scenario: str
+    step: Step
+    samples: list = field(default_factory=list)
+
+    def summary(self):
+        def stats(values):
+            ordered = sorted(values)
+            summary = {f"p{p}": _percentile(ordered, p) for p in PERCENTILES}
+            summary.update(mean=round(sum(ordered) / len(ordered), 3), max=ordered[-1])
+            return summary
+
+        return {
+            "scenario": self.scenario,
+            "step": self.step.name,
+            "method": self.step.method.upper(),
+            "path": self.step.path,
+            "samples": len(self.samples),
+            "statuses": sorted({sample.status for sample in self.samples}),
+            "latency_ms": stats(
+                [round(sample.milliseconds, 3) for sample in self.samples]
+            ),
+            "queries": stats([sample.queries for sample in self.samples]),
+            "rows": stats([sample.rows for sample in self.samples]),
+            "bytes": stats([sample.size for sample in self.samples]),
+        }
+
+
+def _percentile(ordered, percentile):
+    # Nearest rank, so reported values are real observations
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class _RowCountingCursor:
+    """Proxy for a DB-API cursor that counts the rows fetched from it"""
+
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        for row in self.cursor:
+            self.counter[0] += 1
+            yield row
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.counter[0] += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self.cursor.fetchmany(*args, **kwargs)
+        self.counter[0] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        self.counter[0] += len(rows)
+        return rows
+
+
+@contextmanager
+def count_rows(connection):
+    """Count the rows fetched through ``connection`` while active.
+
+    The raw driver cursor is wrapped, beneath Django's (and any debug
+    tooling's) cursor wrappers.
+    """
+    counter = [0]
+    create_cursor = connection.create_cursor
+    connection.create_cursor = lambda *args, **kwargs: _RowCountingCursor(
+        create_cursor(*args, **kwargs), counter
+    )
+    try:
+        yield counter
+    finally:
+        del connection.create_cursor
+
+
+def _resolve_lecturer():
+    result = (
+        Result.objects.filter(status="D", assessments__isnull=False)
+        .select_related("course__lecturer")
+        .order_by("id")
+        .first()
+    )
+    if result is None:
+        return None
+    ids = list(
+        Assessment.objects.filter(result=result)
+        .order_by("id")
+        .values_list("id", flat=True)[:50]
+    )
+    return {
+        "user": result.course.lecturer,
+        "course": result.course_id,
+        "result": result.pk,
+        "assessment": ids[0],
+        "scores": [{"id": pk, "exam_mark": "45.00"} for pk in ids],
+    }
+
+
+def _resolve_dro():
+    User = get_user_model()
+    for result in Result.objects.filter(status="P_D").select_related(
+        "course__program"
+    ).order_by("id")[:50]:
+        user = User.objects.filter(
+            is_dro=True, profile__department_id=result.course.program.department_id
+        ).first()
+        if user is not None:
+            return {"user": user, "result": result.pk}
+    return None
+
+
+def _resolve_co():
+    User = get_user_model()
+    user = User.objects.filter(is_co=True).order_by("id").first()
+    result = (
+        Result.objects.filter(status="A", assessments__isnull=False)
+        .select_related("course")
+        .order_by("id")
+        .first()
+    )
+    if user is None or result is None:
+        return None
+    student_id = (
+        Assessment.objects.filter(result=result)
+        .order_by("id")
+        .values_list("student_id", flat=True)
+        .first()
+    )
+    return {
+        "user": user,
+        "result": result.pk,
+        "program": result.course.program_id,
+        "student": student_id,
+    }
+
+
+def _resolve_notifications():
+    User = get_user_model()
+    user = (
+        User.objects.filter(
+            Exists(
+                Notification.objects.filter(recipient=OuterRef("pk"), is_read=False)
+            )
+        )
+        .order_by("id")
+        .first()
+    )
+    return {"user": user} if user is not None else None
+
+
+SCENARIOS = [
+    Scenario(
+        "lecturer_fill_course",
+        "A lecturer lists a draft result, enters scores and submits it",
+        [
+            Step(
+                "list_assessments",
+                "get",
+                "/result-system/courses/{course}/results/{result}/assessments/"
+                "?page_size=50",
+            ),
+            Step(
+                "update_assessment",
+                "patch",
+                "/result-system/courses/{course}/results/{result}/assessments/"
+                "{assessment}/",
+                {"exam_mark": "50.00"},
+            ),
+            Step(
+                "bulk_update",
+                "patch",
+                "/result-system/courses/{course}/results/{result}/assessments/"
+                "bulk-update/",
+                {"correction_reason": "benchmark", "scores": "{scores}"},
+            ),
+            Step(
+                "submit",
+                "put",
+                "/result-system/courses/{course}/results/{result}/submit/",
+            ),
+        ],
+        _resolve_lecturer,
+    ),
+    Scenario(
+        "dro_approve_department",
+        "A DRO reviews a pending result and forwards it to the faculty",
+        [
+            Step("list_pending", "get", "/result-system/submitted-results/"),
+            Step(
+                "list_scores",
+                "get",
+                "/result-system/submitted-results/{result}/scores/?page_size=50",
+            ),
+            Step("stats", "get", "/result-system/submitted-results/{result}/stats/"),
+            Step(
+                "approve",
+                "patch",
+                "/result-system/submitted-results/{result}/",
+                {"status": "P_F"},
+            ),
+        ],
+        _resolve_dro,
+    ),
+    Scenario(
+        "co_browse_approved",
+        "The CO browses approved results, exports a program and opens a transcript",
+        [
+            Step(
+                "list_approved", "get", "/result-system/submitted-results/?page_size=50"
+            ),
+            Step(
+                "list_scores",
+                "get",
+                "/result-system/submitted-results/{result}/scores/?page_size=100",
+            ),
+            Step(
+                "export_program",
+                "get",
+                "/result-system/submitted-results/export/?program={program}",
+            ),
+            Step("standing", "get", "/result-system/students/{student}/standing/"),
+            Step("transcript", "get", "/result-system/students/{student}/transcript/"),
+        ],
+        _resolve_co,
+    ),
+    Scenario(
+        "notification_feed",
+        "A staff member checks the unread badge, reads the feed and clears it",
+        [
+            Step("unread_count", "get", "/notification/unread-count/"),
+            Step("feed", "get", "/notification/"),
+            Step("mark_all_read", "post", "/notification/mark-all-read/"),
+        ],
+        _resolve_notifications,
+    ),
+]
+
+
+def _fill(template, context):
+    if isinstance(template, str):
+        if template.startswith("{") and template.endswith("}"):
+            key = template[1:-1]
+            if key in context:
+                # Whole-value placeholders keep their type (lists, ints)
+                return context[key]
+        return template.format(**context)
+    if isinstance(template, dict):
+        return {key: _fill(value, context) for key, value in template.items()}
+    return template
+
+
+def _run_pending_on_commit(connection, start):
+    # Inside the benchmark transaction nothing commits, so run the deferred
+    # work (standing refresh, audit, notifications) as part of the request
+    while len(connection.run_on_commit) > start:
+        _, callback, _ = connection.run_on_commit.pop(start)
+        callback()
+
+
+def run_step(client, step, context, connection):
+    path = _fill(step.path, context)
+    data = _fill(step.data, context)
+    request = getattr(client, step.method)
+    start_callbacks = len(connection.run_on_commit)
+    with CaptureQueriesContext(connection) as queries, count_rows(
+        connection
+    ) as rows:
+        start = time.perf_counter()
+        response = request(path, data, format="json") if data else request(path)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        _run_pending_on_commit(connection, start_callbacks)
+        elapsed = (time.perf_counter() - start) * 1000
+    return Sample(elapsed, len(queries), rows[0], response.status_code, size)
+
+
+def access_token(user):
+    """An access token with the claims a login would issue"""
+    return str(TokenObtainPairSerializer.get_token(user).access_token)
+
+
+def run_benchmarks(scenarios=None, iterations=20, warmup=2, log=None):
+    """Run every scenario ``iterations`` times and return the report rows.
+
+    Each iteration runs inside a savepoint that is rolled back, so every
+    pass starts from the same data. The caller owns the outer transaction.
+    """
+    log = log or (lambda message: None)
+    connection = connections[DEFAULT_DB_ALIAS]
+    measurements = []
+    skipped = []
+    for scenario in scenarios or SCENARIOS:
+        context = scenario.resolve()
+        if context is None:
+            skipped.append(scenario.name)
+            log(f"Skipping {scenario.name}: no matching data")
+            continue
+        # A real token, so the numbers include JWT authentication
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"JWT {access_token(context['user'])}")
+        by_step = {
+            step.name: Measurements(scenario.name, step) for step in scenario.steps
+        }
+        for iteration in range(warmup + iterations):
+            with transaction.atomic():
+                for step in scenario.steps:
+                    sample = run_step(client, step, context, connection)
+                    if iteration >= warmup:
+                        by_step[step.name].samples.append(sample)
+                transaction.set_rollback(True)
+        measurements.extend(by_step.values())
+        log(f"{scenario.name}: {iterations} iterations")
+    return [measurement.summary() for measurement in measurements], skipped
+
+
+def compare(report, baseline):
+    """Pair every endpoint with its baseline entry: (entry, old_entry or None)"""
+    old = {(entry["scenario"], entry["step"]): entry for entry in baseline}
+    return [(entry, old.get((entry["scenario"], entry["step"]))) for entry in report]
+
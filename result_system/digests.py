@@ -0,0 +1,105 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.formats import date_format
+
+from notification.outbox import enqueue_digest
+
+from .models import Assessment
+
+DIGEST_TEMPLATE = "./result_system/emails/modification_digest.html"
+# Seconds to hold a digest open for further corrections; 0 sends one per request
+DIGEST_WINDOW = getattr(settings, "RESULT_MODIFICATION_DIGEST_WINDOW", 0)
+
+FIELD_DISPLAY_NAMES = {
+    "ca_slot1": "CA Slot 1",
+    "ca_slot2": "CA Slot 2",
+    "ca_slot3": "CA Slot 3",
+    "ca_slot4": "CA Slot 4",
+    "exam_mark": "Exam Mark",
+}
+
+
+def _format_value(value):
+    return f"{value:.2f}" if isinstance(value, float) else value
+
+
+def format_changes(old_data, new_data):
+    return [
+        {
+            "field": FIELD_DISPLAY_NAMES.get(field, field.replace("_", " ").title()),
+            "old_value": _format_value(old_value),
+            "new_value": _format_value(new_data.get(field, "")),
+        }
+        for field, old_value in old_data.items()
+    ]
+
+
+def queue_modification_digest(logs, window=DIGEST_WINDOW):
+    """Queue one email per (lecturer, result) listing every change in ``logs``.
+
+    Student and course details for all logs are read with a single query.
+    """
+    if not logs:
+        return
+    details = {
+        row["id"]: row
+        for row in Assessment.objects.filter(
+            id__in={log.assessment_id for log in logs}
+        ).values(
+            "id",
+            "result_id",
+            "student__name",
+            "student__student_id",
+            "result__course__name",
+            "result__course__code",
+            "result__course__lecturer_id",
+            "result__course__lecturer__email",
+        )
+    }
+
+    groups = defaultdict(list)
+    for log in logs:
+        row = details[log.assessment_id]
+        groups[(row["result__course__lecturer_id"], row["result_id"])].append(
+            (log, row)
+        )
+
+    for (lecturer_id, result_id), entries in groups.items():
+        row = entries[0][1]
+        context = {
+            "system_name": "University Results System",
+            "domain": "yourdomain.edu",
+            "course": {
+                "name": row["result__course__name"],
+                "code": row["result__course__code"],
+            },
+        }
+        enqueue_digest(
+            DIGEST_TEMPLATE,
+            f"result-modification:{lecturer_id}:{result_id}",
+            [row["result__course__lecturer__email"]],
+            context,
+            [_entry(log, row) for log, row in entries],
+            window=window,
+        )
+
+
+def _entry(log, row):
+    modified_by = log.modified_by
+    return {
+        "student": {
+            "name": row["student__name"],
+            "student_id": row["student__student_id"],
+        },
+        "modified_by": (
+            modified_by.get_full_name() or modified_by.username if modified_by else ""
+        ),
+        "modified_at": date_format(
+            timezone.localtime(log.modified_at), "F j, Y H:i"
+        ),
+        "reason": log.reason,
+        "changes": format_changes(log.old_data, log.new_data),
+        "detail_url": f"http://results/{log.assessment_id}/",
+    }
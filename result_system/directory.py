@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.db.models import Q
+
+# Entries also expire on their own, to bound staleness in other processes
+TTL = 5 * 60
+
+CourseInfo = namedtuple(
+    "CourseInfo", ["id", "name", "code", "lecturer_id", "department_id"]
+)
+
+_lock = threading.Lock()
+_officers = None
+_courses = {}
+_built_at = 0.0
+
+
+def _build_officers():
+    from .models import Profile
+
+    officers = {"dro": defaultdict(list), "fro": defaultdict(list)}
+    for user_id, department_id, is_dro, is_fro in (
+        Profile.objects.filter(
+            Q(user__is_dro=True) | Q(user__is_fro=True),
+            user__is_active=True,
+            department__isnull=False,
+        ).values_list("user_id", "department_id", "user__is_dro", "user__is_fro")
+    ):
+        if is_dro:
+            officers["dro"][department_id].append(user_id)
+        if is_fro:
+            officers["fro"][department_id].append(user_id)
+    return officers
+
+
+def _fresh():
+    global _officers, _built_at
+    if _officers is None or time.monotonic() - _built_at > TTL:
+        with _lock:
+            if _officers is None or time.monotonic() - _built_at > TTL:
+                _courses.clear()
+                _officers = _build_officers()
+                _built_at = time.monotonic()
+    return _officers
+
+
+def department_officers(department_id, role="dro"):
+    """User ids of the active DROs (or FROs) whose profile is in a department"""
+    return list(_fresh()[role].get(department_id, ()))
+
+
+def course_info(course_id):
+    """Name, lecturer and department id of a course, cached (None if gone)"""
+    _fresh()
+    info = _courses.get(course_id)
+    if info is None:
+        from .models import Course
+
+        row = (
+            Course.objects.filter(pk=course_id)
+            .values_list(
+                "id",
+                "name",
+                "code",
+                "lecturer_id",
+                "program__department_id",
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        info = _courses[course_id] = CourseInfo(*row)
+    return info
+
+
+def invalidate():
+    global _officers
+    with _lock:
+        _officers = None
+        _courses.clear()
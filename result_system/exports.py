@@ -0,0 +1,69 @@
+import csv
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = {
+    "student_id": "student__student_id",
+    "student_name": "student__name",
+    "course_code": "result__course__code",
+    "course_name": "result__course__name",
+    "credit": "result__course__credit",
+    "program": "result__course__program__name",
+    "department": "result__course__program__department__name",
+    "faculty": "result__course__program__department__faculty__name",
+    "ca_slot1": "ca_slot1",
+    "ca_slot2": "ca_slot2",
+    "ca_slot3": "ca_slot3",
+    "ca_slot4": "ca_slot4",
+    "exam_mark": "exam_mark",
+    "total_score": "total_score",
+    "grade": "grade",
+}
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    # Match the API, which renders decimals as numbers (COERCE_DECIMAL_TO_STRING)
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return super().default(o)
+
+
+class Echo:
+    """File-like object whose write() hands the row straight back to csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _iter_values(queryset):
+    # iterator() uses a server-side cursor where the backend supports it,
+    # so rows are fetched from the database in chunks as they are sent
+    return (
+        queryset.order_by("result_id", "student__student_id")
+        .values_list(*EXPORT_FIELDS.values())
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS.keys())
+    for row in _iter_values(queryset):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset):
+    names = list(EXPORT_FIELDS.keys())
+    for row in _iter_values(queryset):
+        yield json.dumps(dict(zip(names, row)), cls=ExportJSONEncoder) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
@@ -1,4 +1,12 @@
-from django_filters.rest_framework import FilterSet
+from django.db.models import Exists, OuterRef
+from django_filters.rest_framework import (
+    ChoiceFilter,
+    FilterSet,
+    IsoDateTimeFilter,
+    NumberFilter,
+)
+
+from .models import Assessment, Enrollment, ResultModificationLog
 
 #class ResultFilter(FilterSet):
 #    class Meta:
@@ -7,4 +15,62 @@ from django_filters.rest_framework import FilterSet
 #            'course' : ['exact'],
 #            'student': ['exact'],
 #            'lecturer': ['exact'],
-#        }
\ No newline at end of file
+#        }
+
+
+class ApprovedAssessmentFilter(FilterSet):
+    faculty = NumberFilter(field_name="result__course__program__department__faculty_id")
+    department = NumberFilter(field_name="result__course__program__department_id")
+    program = NumberFilter(field_name="result__course__program_id")
+    academic_year = NumberFilter(method="filter_term")
+    semester = ChoiceFilter(
+        choices=Enrollment._meta.get_field("semester").choices, method="filter_term"
+    )
+
+    class Meta:
+        model = Assessment
+        fields = ["faculty", "department", "program", "academic_year", "semester"]
+
+    def filter_term(self, queryset, name, value):
+        # Applied once for both term fields in filter_queryset
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        term = {
+            name: self.form.cleaned_data[name]
+            for name in ("academic_year", "semester")
+            if self.form.cleaned_data.get(name) not in (None, "")
+        }
+        if term:
+            # Both term fields must match the same enrollment row
+            queryset = queryset.filter(
+                Exists(
+                    Enrollment.objects.filter(
+                        student_id=OuterRef("student_id"),
+                        course_id=OuterRef("result__course_id"),
+                        **term,
+                    )
+                )
+            )
+        return queryset
+
+
+class ResultModificationLogFilter(FilterSet):
+    result = NumberFilter(field_name="assessment__result_id")
+    course = NumberFilter(field_name="assessment__result__course_id")
+    student = NumberFilter(field_name="assessment__student_id")
+    modified_by = NumberFilter(field_name="modified_by_id")
+    modified_after = IsoDateTimeFilter(field_name="modified_at", lookup_expr="gte")
+    modified_before = IsoDateTimeFilter(field_name="modified_at", lookup_expr="lt")
+
+    class Meta:
+        model = ResultModificationLog
+        fields = [
+            "result",
+            "course",
+            "student",
+            "modified_by",
+            "modified_after",
+            "modified_before",
+        ]
@@ -0,0 +1,118 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.dispatch import pre_bulk_update
+
+SCORE_FIELDS = ("ca_slot1", "ca_slot2", "ca_slot3", "ca_slot4", "exam_mark")
+GRADED_FIELDS = ("total_score", "grade")
+
+# Lower bound of every grade band, ascending. Anything below the first bound is "E".
+GRADE_BOUNDARIES = [
+    (Decimal("50"), "D"),
+    (Decimal("55"), "D+"),
+    (Decimal("60"), "C"),
+    (Decimal("65"), "C+"),
+    (Decimal("70"), "B"),
+    (Decimal("75"), "B+"),
+    (Decimal("80"), "A"),
+]
+FAIL_GRADE = "E"
+INCOMPLETE_GRADE = "IC"
+
+# Points per credit; incomplete (IC) assessments are not counted
+GRADE_POINTS = {
+    "A": Decimal("4.0"),
+    "B+": Decimal("3.5"),
+    "B": Decimal("3.0"),
+    "C+": Decimal("2.5"),
+    "C": Decimal("2.0"),
+    "D+": Decimal("1.5"),
+    "D": Decimal("1.0"),
+    FAIL_GRADE: Decimal("0"),
+}
+
+_BOUNDS = [bound for bound, _ in GRADE_BOUNDARIES]
+_GRADES = [FAIL_GRADE] + [grade for _, grade in GRADE_BOUNDARIES]
+
+BATCH_SIZE = 500
+
+
+def grade_for(total_score):
+    """Return the letter grade for a total score"""
+    return _GRADES[bisect_right(_BOUNDS, total_score)]
+
+
+def compute_grade(ca_slot1, ca_slot2, ca_slot3, ca_slot4, exam_mark):
+    """Return (total_score, grade) for one set of marks.
+
+    Missing CA slots count as zero; a missing exam mark means the
+    assessment is incomplete.
+    """
+    if exam_mark is None:
+        return None, INCOMPLETE_GRADE
+    total = (
+        (ca_slot1 or Decimal("0"))
+        + (ca_slot2 or Decimal("0"))
+        + (ca_slot3 or Decimal("0"))
+        + (ca_slot4 or Decimal("0"))
+        + exam_mark
+    )
+    return total, grade_for(total)
+
+
+def grade_assessments(assessments):
+    """Set total_score/grade on every assessment in memory.
+
+    Returns the assessments whose total_score or grade actually changed.
+    """
+    changed = []
+    for assessment in assessments:
+        total, grade = compute_grade(
+            *(getattr(assessment, field) for field in SCORE_FIELDS)
+        )
+        if total != assessment.total_score or grade != assessment.grade:
+            assessment.total_score = total
+            assessment.grade = grade
+            changed.append(assessment)
+    return changed
+
+
+def recompute_grades(assessments, batch_size=BATCH_SIZE):
+    """Regrade a queryset (or a Result's assessments) and persist the changes.
+
+    Rows are streamed in chunks and each chunk is written back with a single
+    bulk UPDATE. Returns the number of rows that changed.
+    """
+    from .models import Assessment, Result
+
+    if isinstance(assessments, Result):
+        assessments = Assessment.objects.filter(result_id=assessments.pk)
+    queryset = assessments.only("id", *SCORE_FIELDS, *GRADED_FIELDS, "updated_at")
+
+    updated = 0
+    chunk = []
+    for assessment in queryset.iterator(chunk_size=batch_size):
+        chunk.append(assessment)
+        if len(chunk) >= batch_size:
+            updated += _write_chunk(Assessment, chunk)
+            chunk = []
+    if chunk:
+        updated += _write_chunk(Assessment, chunk)
+    return updated
+
+
+def _write_chunk(model, chunk):
+    changed = grade_assessments(chunk)
+    if changed:
+        now = timezone.now()
+        for assessment in changed:
+            assessment.updated_at = now
+        fields = GRADED_FIELDS + ("updated_at",)
+        # Receivers queue on_commit work, which must not outlive a failed write
+        with transaction.atomic():
+            pre_bulk_update.send(sender=model, instances=changed, fields=fields)
+            model.objects.bulk_update(changed, fields)
+    return len(changed)
@@ -0,0 +1,138 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from result_system import directory, scopes
+from result_system.benchmark import SCENARIOS, compare, run_benchmarks
+from result_system.synthetic import DatasetGenerator, DatasetSpec
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the API in-process through scripted scenarios and report "
+        "p50/p95/p99 latency, query counts and rows fetched per endpoint. "
+        "All writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=[scenario.name for scenario in SCENARIOS],
+            help="Only run this scenario (repeatable)",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=2,
+            help="Unmeasured iterations run first, to warm caches",
+        )
+        parser.add_argument(
+            "--seed-students",
+            type=int,
+            default=0,
+            help="Generate a synthetic dataset of this size first (rolled back "
+            "with everything else)",
+        )
+        parser.add_argument("--seed-courses", type=int, default=200)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--baseline", help="Compare against a JSON report from an earlier run"
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)["endpoints"]
+        scenarios = [
+            scenario
+            for scenario in SCENARIOS
+            if not options["scenarios"] or scenario.name in options["scenarios"]
+        ]
+
+        try:
+            with transaction.atomic():
+                if options["seed_students"]:
+                    DatasetGenerator(
+                        DatasetSpec(
+                            prefix="BENCHAPI",
+                            students=options["seed_students"],
+                            courses=options["seed_courses"],
+                        ),
+                        log=self.stdout.write,
+                    ).generate()
+                endpoints, skipped = run_benchmarks(
+                    scenarios,
+                    iterations=options["iterations"],
+                    warmup=options["warmup"],
+                    log=self.stdout.write,
+                )
+                transaction.set_rollback(True)
+        finally:
+            # Cached lookups may point at rolled back rows
+            directory.invalidate()
+            scopes.invalidate_all()
+
+        report = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "skipped": skipped,
+            "endpoints": endpoints,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        self.write_table(endpoints, baseline)
+        if not endpoints:
+            raise CommandError(
+                "No scenario found matching data; run generate_dataset or pass "
+                "--seed-students"
+            )
+
+    def write_table(self, endpoints, baseline):
+        self.stdout.write(
+            f"{'endpoint':44} {'p50':>8} {'p95':>8} {'p99':>8} "
+            f"{'queries':>8} {'rows':>8}  status"
+        )
+        if baseline:
+            rows = compare(endpoints, baseline)
+        else:
+            rows = [(entry, None) for entry in endpoints]
+        for entry, old in rows:
+            latency = entry["latency_ms"]
+            line = (
+                f"{entry['scenario'] + '.' + entry['step']:44} "
+                f"{latency['p50']:8.2f} {latency['p95']:8.2f} {latency['p99']:8.2f} "
+                f"{entry['queries']['max']:8} {entry['rows']['max']:8}  "
+                f"{','.join(map(str, entry['statuses']))}"
+            )
+            if old is not None:
+                line += self.delta(entry, old)
+            self.stdout.write(line)
+
+    def delta(self, entry, old):
+        old_p95 = old["latency_ms"]["p95"]
+        change = (
+            (entry["latency_ms"]["p95"] - old_p95) / old_p95 * 100 if old_p95 else 0
+        )
+        queries = entry["queries"]["max"] - old["queries"]["max"]
+        text = f"  p95 {change:+.0f}%"
+        if queries:
+            style = self.style.ERROR if queries > 0 else self.style.SUCCESS
+            text += style(f" queries {queries:+d}")
+        return text
@@ -0,0 +1,105 @@
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from notification.models import Notification
+from notification.views import NotificationViewset
+from result_system.models import Faculty, Result
+from result_system.synthetic import DatasetGenerator, DatasetSpec
+from result_system.views import AssessmentViewSet, ViewResultViewSet
+
+User = get_user_model()
+
+ROLES = ("lecturer", "dro", "fro", "co")
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans and timings for the result, assessment and "
+        "notification get_queryset branches, optionally seeding data first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-students",
+            type=int,
+            default=0,
+            help="Seed this many students (with courses, results and "
+            "assessments) before explaining",
+        )
+        parser.add_argument("--seed-courses", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE (PostgreSQL)",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed_students"]:
+            self.seed(options["seed_students"], options["seed_courses"])
+
+        explain_options = {"analyze": True} if options["analyze"] else {}
+        for label, queryset in self.branches():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write(self.timing(queryset, options["repeat"]))
+            self.stdout.write("")
+
+    def branches(self):
+        result = Result.objects.filter(status="P_D").first() or Result.objects.first()
+        for role in ROLES:
+            users = User.objects.filter(**{f"is_{role}": True})
+            if role == "lecturer":
+                # A lecturer without courses would explain an empty queryset
+                users = users.filter(courses__isnull=False).distinct()
+            user = users.first()
+            if user is None:
+                self.stderr.write(f"No {role} user, skipping")
+                continue
+            request = SimpleNamespace(user=user)
+
+            view = ViewResultViewSet(request=request, kwargs={})
+            yield f"ViewResultViewSet ({role})", view.get_queryset()[:10]
+
+            if result is not None:
+                view = AssessmentViewSet(
+                    request=request, kwargs={"result_pk": result.pk}
+                )
+                yield f"AssessmentViewSet ({role})", view.get_queryset().order_by(
+                    "id"
+                )[:10]
+
+            view = NotificationViewset(request=request, kwargs={})
+            yield f"NotificationViewset ({role})", view.get_queryset()[:10]
+            yield f"Unread notifications ({role})", Notification.objects.filter(
+                recipient=user, is_read=False
+            )
+
+    def timing(self, queryset, repeat):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            durations.append((time.perf_counter() - start) * 1000)
+        durations.sort()
+        return (
+            f"{repeat} runs: min {durations[0]:.2f} ms, "
+            f"median {durations[len(durations) // 2]:.2f} ms, "
+            f"max {durations[-1]:.2f} ms"
+        )
+
+    def seed(self, students, courses):
+        spec = DatasetSpec(
+            prefix=f"BENCH{Faculty.objects.count()}", students=students, courses=courses
+        )
+        counts = DatasetGenerator(spec).generate()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {students} students, {courses} courses and "
+                f"{counts['assessments']} assessments on {connection.vendor}"
+            )
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from result_system.models import Student, StudentTermSummary
+from result_system.standing import BATCH_SIZE, refresh_student_standing
+from result_system.transcripts import refresh_transcripts
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the StudentTermSummary table (GPA/CGPA) and transcript "
+        "snapshots from approved results"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--student",
+            action="append",
+            dest="students",
+            help="Only rebuild this student_id (repeatable)",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        students = Student.objects.all()
+        if options["students"]:
+            students = students.filter(student_id__in=options["students"])
+        else:
+            # Drop summaries of students who no longer exist in any batch
+            StudentTermSummary.objects.exclude(
+                student_id__in=Student.objects.values("id")
+            ).delete()
+
+        student_ids = list(students.values_list("id", flat=True))
+        refresh_student_standing(student_ids, batch_size=options["batch_size"])
+        # Transcripts read the summaries, so they are rebuilt second
+        refresh_transcripts(student_ids, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{StudentTermSummary.objects.count()} term summaries rebuilt"
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from result_system.grading import BATCH_SIZE, recompute_grades
+from result_system.models import Assessment
+
+
+class Command(BaseCommand):
+    help = "Recompute total_score and grade for assessments in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--result",
+            type=int,
+            action="append",
+            dest="results",
+            help="Only regrade the assessments of this result (repeatable)",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        assessments = Assessment.objects.all()
+        if options["results"]:
+            assessments = assessments.filter(result_id__in=options["results"])
+        updated = recompute_grades(assessments, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Regraded {updated} assessment(s)"))
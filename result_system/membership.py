@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Invalidation policy: see SHARED_CACHE_TIMEOUT in settings
+CACHE_TIMEOUT = getattr(settings, "MEMBERSHIP_CACHE_TIMEOUT", 30)
+
+
+def _course_key(course_id):
+    return f"result_system:enrollment:course:{course_id}"
+
+
+def _result_key(result_id):
+    return f"result_system:result:{result_id}:course"
+
+
+def enrolled_student_ids(course_id):
+    """Return the frozenset of student ids enrolled in a course.
+
+    The set is built with one query and cached until an Enrollment for the
+    course changes (see signals.invalidate_enrollment_membership).
+    """
+    from .models import Enrollment
+
+    key = _course_key(course_id)
+    student_ids = cache.get(key)
+    if student_ids is None:
+        student_ids = frozenset(
+            Enrollment.objects.filter(course_id=course_id).values_list(
+                "student_id", flat=True
+            )
+        )
+        cache.set(key, student_ids, CACHE_TIMEOUT)
+    return student_ids
+
+
+def course_id_for_result(result_id):
+    """Return the course id of a result without loading the Result row"""
+    from .models import Result
+
+    key = _result_key(result_id)
+    course_id = cache.get(key)
+    if course_id is None:
+        course_id = (
+            Result.objects.filter(pk=result_id)
+            .values_list("course_id", flat=True)
+            .first()
+        )
+        if course_id is not None:
+            cache.set(key, course_id, CACHE_TIMEOUT)
+    return course_id
+
+
+def is_enrolled(student_id, course_id):
+    return student_id in enrolled_student_ids(course_id)
+
+
+def invalidate_course(*course_ids):
+    cache.delete_many([_course_key(course_id) for course_id in course_ids])
+
+
+def invalidate_result(result_id):
+    cache.delete(_result_key(result_id))
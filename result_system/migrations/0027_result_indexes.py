@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0026_alter_profile_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['status', 'course'], name='result_status_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('status__in', ['P_D', 'P_F'])), fields=['course'], name='result_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0027_result_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTermSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.IntegerField()),
+                ('semester', models.CharField(choices=[('Sem1', 'Semester 1'), ('Sem2', 'Semester 2')], max_length=10)),
+                ('credits_attempted', models.PositiveIntegerField(default=0)),
+                ('credits_earned', models.PositiveIntegerField(default=0)),
+                ('grade_points', models.DecimalField(decimal_places=2, default=0, max_digits=7)),
+                ('gpa', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('cumulative_credits_attempted', models.PositiveIntegerField(default=0)),
+                ('cumulative_credits_earned', models.PositiveIntegerField(default=0)),
+                ('cumulative_grade_points', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('cgpa', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_summaries', to='result_system.student')),
+            ],
+            options={
+                'unique_together': {('student', 'academic_year', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0028_studenttermsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptSnapshot',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='transcript', serialize=False, to='result_system.student')),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('data', models.JSONField()),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0029_transcriptsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
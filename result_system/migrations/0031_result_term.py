@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0030_assessment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='academic_year',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='semester',
+            field=models.CharField(blank=True, choices=[('Sem1', 'Semester 1'), ('Sem2', 'Semester 2')], max_length=10, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0031_result_term'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resultmodificationlog',
+            index=models.Index(fields=['-modified_at', '-id'], name='modlog_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultmodificationlog',
+            index=models.Index(fields=['modified_by', '-modified_at'], name='modlog_modifier_idx'),
+        ),
+    ]
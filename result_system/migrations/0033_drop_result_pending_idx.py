@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result_system', '0032_modification_log_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='result',
+            name='result_pending_idx',
+        ),
+    ]
@@ -1,11 +1,15 @@
-from decimal import Decimal
-
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.forms import ValidationError
 
+from .grading import compute_grade
+from .membership import course_id_for_result, is_enrolled
+
+
+SEMESTER_CHOICES = [("Sem1", "Semester 1"), ("Sem2", "Semester 2")]
+
 
 class Faculty(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -78,9 +82,7 @@ class Enrollment(models.Model):
         Course, on_delete=models.CASCADE, related_name="enrolled_course"
     )
     academic_year = models.IntegerField()  # e.g., 2025
-    semester = models.CharField(
-        max_length=10, choices=[("Sem1", "Semester 1"), ("Sem2", "Semester 2")]
-    )
+    semester = models.CharField(max_length=10, choices=SEMESTER_CHOICES)
 
     class Meta:
         unique_together = [("student", "course", "academic_year", "semester")]
@@ -107,6 +109,17 @@ class Result(models.Model):
     )
     submitted_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=50, choices=RESULT_STATUS, default="D")
+    # Optional term; when set, only enrollments for that term get assessments
+    academic_year = models.IntegerField(null=True, blank=True)
+    semester = models.CharField(
+        max_length=10, choices=SEMESTER_CHOICES, null=True, blank=True
+    )
+
+    class Meta:
+        indexes = [
+            # Reviewer queues: status plus the course/program scope
+            models.Index(fields=["status", "course"], name="result_status_course_idx"),
+        ]
 
     # def clean(self):
     #    # Ensure lecturer is assigned to the course
@@ -169,6 +182,8 @@ class Assessment(models.Model):
         editable=False,  # Prevents manual editing in forms/admin
     )
     grade = models.CharField(max_length=2, null=True, blank=True, editable=False)
+    # Bulk writers (bulk_update) must set this themselves
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Grading thresholds (adjust as needed)
 
@@ -187,41 +202,23 @@ class Assessment(models.Model):
         #        raise ValidationError("Exam marks cannot exceed 60")
         #
         # Ensure student is enrolled in the course
-        if not Enrollment.objects.filter(
-            student=self.student, course=self.result.course
-        ).exists():
+        if Assessment.result.is_cached(self):
+            course_id = self.result.course_id
+        else:
+            course_id = course_id_for_result(self.result_id)
+        if not is_enrolled(self.student_id, course_id):
             raise ValidationError("Student is not enrolled in this course")
 
     def save(self, *args, **kwargs):
-        if self.exam_mark is not None:
-            # Convert None to Decimal(0) for CA slots
-            ca1 = self.ca_slot1 or Decimal("0")
-            ca2 = self.ca_slot2 or Decimal("0")
-            ca3 = self.ca_slot3 or Decimal("0")
-            ca4 = self.ca_slot4 or Decimal("0")
-
-            self.total_score = ca1 + ca2 + ca3 + ca4 + self.exam_mark
-
-            if self.total_score >= 80:
-                self.grade = "A"
-            elif self.total_score >= 75:
-                self.grade = "B+"
-            elif self.total_score >= 70:
-                self.grade = "B"
-            elif self.total_score >= 65:
-                self.grade = "C+"
-            elif self.total_score >= 60:
-                self.grade = "C"
-            elif self.total_score >= 55:
-                self.grade = "D+"
-            elif self.total_score >= 50:
-                self.grade = "D"
-            else:
-                self.grade = "E"
+        self.total_score, self.grade = compute_grade(
+            self.ca_slot1, self.ca_slot2, self.ca_slot3, self.ca_slot4, self.exam_mark
+        )
+        if self._state.adding:
+            self.full_clean()
         else:
-            self.total_score = None
-            self.grade = "IC"
-        self.full_clean()
+            # result/student never change once the row exists and the
+            # database already enforces them, so skip their lookups
+            self.full_clean(exclude=["result", "student"], validate_unique=False)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -240,8 +237,58 @@ class ResultModificationLog(models.Model):
     reason = models.TextField()
     modified_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order, also used by date range filters
+            models.Index(fields=["-modified_at", "-id"], name="modlog_recent_idx"),
+            models.Index(
+                fields=["modified_by", "-modified_at"], name="modlog_modifier_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Modification by {self.modified_by} on {self.modified_at}"
 
 
+class StudentTermSummary(models.Model):
+    """Materialized per-term standing, maintained by result_system.standing"""
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="term_summaries"
+    )
+    academic_year = models.IntegerField()
+    semester = models.CharField(max_length=10, choices=SEMESTER_CHOICES)
+    credits_attempted = models.PositiveIntegerField(default=0)
+    credits_earned = models.PositiveIntegerField(default=0)
+    grade_points = models.DecimalField(max_digits=7, decimal_places=2, default=0)
+    gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    cumulative_credits_attempted = models.PositiveIntegerField(default=0)
+    cumulative_credits_earned = models.PositiveIntegerField(default=0)
+    cumulative_grade_points = models.DecimalField(
+        max_digits=8, decimal_places=2, default=0
+    )
+    cgpa = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("student", "academic_year", "semester")]
+
+    def __str__(self):
+        return f"{self.student} {self.academic_year} {self.semester}: {self.gpa}"
+
+
+class TranscriptSnapshot(models.Model):
+    """Precomputed transcript, regenerated by result_system.transcripts"""
+
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name="transcript"
+    )
+    version = models.PositiveIntegerField(default=1)
+    data = models.JSONField()
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Transcript of {self.student_id} v{self.version}"
+
+
 # Create your models here.
@@ -1,19 +1,27 @@
+import logging
+
 from rest_framework import permissions
 
 from result_system.models import Result
 
+logger = logging.getLogger(__name__)
+
 
 class IsResultDraft(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        if view.action == "submit":
+        if view.action in ("submit", "sync_assessments"):
             return True
         if "status" in request.data:
             current_status = obj.status
-            print(current_status)
             new_status = request.data["status"]
-            print(new_status)
+            logger.debug(
+                "Result %s status change %s -> %s requested",
+                obj.pk,
+                current_status,
+                new_status,
+            )
             if current_status != "D":
                 return False
             if new_status != "P_D":
@@ -26,7 +34,7 @@ class IsResultDraft(permissions.BasePermission):
 
 class CanCreateResult(permissions.BasePermission):
     def has_permission(self, request, view):
-        if request.method != "POST":
+        if request.method != "POST" or view.action != "create":
             return True
         course_pk = view.kwargs.get("course_pk")
         if not course_pk:
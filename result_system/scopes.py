@@ -0,0 +1,145 @@
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Invalidation policy: see SHARED_CACHE_TIMEOUT in settings
+CACHE_TIMEOUT = getattr(settings, "SCOPE_CACHE_TIMEOUT", 30)
+_VERSION_KEY = "result_system:scope:version"
+
+# Result status each reviewing role works on
+ROLE_STATUS = {"dro": "P_D", "fro": "P_F", "co": "A"}
+
+
+@dataclass(frozen=True)
+class UserScope:
+    """What a user may see, resolved to plain ids"""
+
+    role: str = None
+    department_id: int = None
+    faculty_id: int = None
+    program_ids: frozenset = field(default_factory=frozenset)
+    course_ids: frozenset = field(default_factory=frozenset)
+
+    def filter_results(self, queryset, prefix=""):
+        """Restrict a Result queryset (or a related one, via ``prefix``)"""
+        if self.role in ("dro", "fro"):
+            return queryset.filter(
+                **{
+                    f"{prefix}status": ROLE_STATUS[self.role],
+                    f"{prefix}course__program_id__in": self.program_ids,
+                }
+            )
+        if self.role == "lecturer":
+            return queryset.filter(**{f"{prefix}course_id__in": self.course_ids})
+        if self.role == "co":
+            return queryset.filter(**{f"{prefix}status": ROLE_STATUS["co"]})
+        return queryset.none()
+
+    def filter_courses(self, queryset, prefix=""):
+        """Restrict a Course queryset (or a related one), whatever the status"""
+        if self.role in ("dro", "fro"):
+            return queryset.filter(**{f"{prefix}program_id__in": self.program_ids})
+        if self.role == "lecturer":
+            return queryset.filter(**{f"{prefix}id__in": self.course_ids})
+        if self.role == "co":
+            return queryset
+        return queryset.none()
+
+    def filter_students(self, queryset):
+        """Restrict a Student queryset to the students this user oversees"""
+        if self.role in ("dro", "fro"):
+            return queryset.filter(program_id__in=self.program_ids)
+        if self.role == "lecturer":
+            return queryset.filter(
+                enrolled_student__course_id__in=self.course_ids
+            ).distinct()
+        if self.role == "co":
+            return queryset
+        return queryset.none()
+
+
+def _role(user):
+    for role in ("dro", "fro", "lecturer", "co"):
+        if getattr(user, f"is_{role}", False):
+            return role
+    return None
+
+
+def _version():
+    return cache.get_or_set(_VERSION_KEY, 1, None)
+
+
+def _key(user_id):
+    return f"result_system:scope:{_version()}:{user_id}"
+
+
+def build_user_scope(user):
+    from .models import Course, Profile, Program
+
+    role = _role(user)
+    claims = getattr(user, "token_claims", None)
+    if claims is not None:
+        # Users authenticated from JWT claims already carry their scope
+        department_id = claims["department_id"]
+        faculty_id = claims["faculty_id"]
+    else:
+        profile = (
+            Profile.objects.filter(user_id=user.id)
+            .values("department_id", "department__faculty_id")
+            .first()
+            or {}
+        )
+        department_id = profile.get("department_id")
+        faculty_id = profile.get("department__faculty_id")
+
+    program_ids = frozenset()
+    course_ids = frozenset()
+    if role == "dro" and department_id:
+        program_ids = frozenset(
+            Program.objects.filter(department_id=department_id).values_list(
+                "id", flat=True
+            )
+        )
+    elif role == "fro" and faculty_id:
+        program_ids = frozenset(
+            Program.objects.filter(department__faculty_id=faculty_id).values_list(
+                "id", flat=True
+            )
+        )
+    elif role == "lecturer":
+        course_ids = frozenset(
+            Course.objects.filter(lecturer_id=user.id).values_list("id", flat=True)
+        )
+    return UserScope(
+        role=role,
+        department_id=department_id,
+        faculty_id=faculty_id,
+        program_ids=program_ids,
+        course_ids=course_ids,
+    )
+
+
+def get_user_scope(user):
+    """Return the cached UserScope for a user, building it on a miss.
+
+    Entries are dropped when the user or their profile changes, and all of
+    them are invalidated when courses, programs or departments change.
+    """
+    key = _key(user.id)
+    scope = cache.get(key)
+    if scope is None:
+        scope = build_user_scope(user)
+        cache.set(key, scope, CACHE_TIMEOUT)
+    return scope
+
+
+def invalidate_user(user_id):
+    cache.delete(_key(user_id))
+
+
+def invalidate_all():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 2, None)
@@ -11,6 +11,7 @@ from .models import (  # SubmittedResult,; SubmittedResultScore,
     Result,
     ResultModificationLog,
     Student,
+    StudentTermSummary,
 )
 
 User = get_user_model()
@@ -49,6 +50,8 @@ class ResultSerializer(serializers.ModelSerializer):
             "updated_at",
             "submitted_at",
             "status",
+            "academic_year",
+            "semester",
         ]
 
     def create(self, validated_data):
@@ -95,11 +98,16 @@ class AssessmentSerializer(serializers.ModelSerializer):
 class ResultModificationLogSerializer(serializers.ModelSerializer):
     modified_by = serializers.StringRelatedField()
     student = serializers.SerializerMethodField()
+    course = serializers.SerializerMethodField()
+    result = serializers.IntegerField(source="assessment.result_id", read_only=True)
 
     class Meta:
         model = ResultModificationLog
         fields = [
             "id",
+            "assessment",
+            "result",
+            "course",
             "student",
             "modified_by",
             "old_data",
@@ -108,8 +116,38 @@ class ResultModificationLogSerializer(serializers.ModelSerializer):
             "modified_at",
         ]
 
-    # def get_student(self, obj):
-    #    return {
-    #        "id": obj.assessment.student.id,
-    #        "name": obj.assessment.student.name,
-    #    }
+    def get_student(self, obj):
+        student = obj.assessment.student
+        return {
+            "id": student.id,
+            "student_id": student.student_id,
+            "name": student.name,
+        }
+
+    def get_course(self, obj):
+        course = obj.assessment.result.course
+        return {"id": course.id, "code": course.code, "name": course.name}
+
+
+class StudentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Student
+        fields = ["id", "student_id", "name", "email", "program_id", "enrollment_year"]
+
+
+class StudentTermSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StudentTermSummary
+        fields = [
+            "academic_year",
+            "semester",
+            "credits_attempted",
+            "credits_earned",
+            "grade_points",
+            "gpa",
+            "cumulative_credits_attempted",
+            "cumulative_credits_earned",
+            "cumulative_grade_points",
+            "cgpa",
+            "updated_at",
+        ]
@@ -1,142 +1,170 @@
 import logging
 
 from django.contrib.auth import get_user_model
-from django.core.mail import BadHeaderError, send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from templated_mail.mail import BaseEmailMessage
 
-from notification.utils import notify
-
-from .models import Assessment, Enrollment, Result, ResultModificationLog
+from core.tokens import revoke_tokens
+from notification.utils import notify_many
+
+from . import directory, membership, scopes
+from .assessments import sync_assessments
+from .standing import refresh_standing_after_commit
+from .models import (
+    Assessment,
+    Course,
+    Department,
+    Enrollment,
+    Profile,
+    Program,
+    Result,
+)
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
 
+@receiver(pre_save, sender=Enrollment, weak=False)
+def invalidate_previous_enrollment_course(sender, instance, raw=False, **kwargs):
+    # Moving an enrollment to another course also changes the old course's set
+    if raw or instance._state.adding:
+        return
+    previous = (
+        Enrollment.objects.filter(pk=instance.pk)
+        .values_list("course_id", flat=True)
+        .first()
+    )
+    if previous is not None and previous != instance.course_id:
+        membership.invalidate_course(previous)
+
+
+@receiver(post_save, sender=Enrollment, weak=False)
+@receiver(post_delete, sender=Enrollment, weak=False)
+def invalidate_enrollment_membership(sender, instance, **kwargs):
+    membership.invalidate_course(instance.course_id)
+
+
 @receiver(post_save, sender=Result, weak=False)
-def create_assessment_for_students_in_result(sender, **kwargs):
-    instance = kwargs["instance"]
-    course = instance.course
-    enrollments = Enrollment.objects.filter(course=course)
-    assessment_create = [
-        Assessment(result=instance, student=enrollment.student)
-        for enrollment in enrollments
-    ]
-    if kwargs["created"]:
-        Assessment.objects.bulk_create(assessment_create)
-
-
-@receiver(post_save, sender=ResultModificationLog, weak=False)
-def send_lecturer_email_for_result_modification(sender, **kwargs):
-    if not kwargs.get("created"):
-        return  # Only send for new instances
-
-    instance = kwargs["instance"]
-
-    try:
-        # Get related objects
-        assessment = instance.assessment
-        result = assessment.result
-        lecturer = result.course.lecturer
-        student = assessment.student
-        course = result.course
-
-        # Prepare changes list with formatted field names
-        changes = []
-        field_display_names = {
-            "ca_slot1": "CA Slot 1",
-            "ca_slot2": "CA Slot 2",
-            "ca_slot3": "CA Slot 3",
-            "ca_slot4": "CA Slot 4",
-            "exam_mark": "Exam Mark",
-        }
-
-        for field, old_value in instance.old_data.items():
-            new_value = instance.new_data.get(field, "")
-
-            # Format values
-            if isinstance(old_value, float):
-                old_value = f"{old_value:.2f}"
-            if isinstance(new_value, float):
-                new_value = f"{new_value:.2f}"
-
-            changes.append(
-                {
-                    "field": field_display_names.get(
-                        field, field.replace("_", " ").title()
-                    ),
-                    "old_value": old_value,
-                    "new_value": new_value,
-                }
-            )
+@receiver(post_delete, sender=Result, weak=False)
+def invalidate_result_course(sender, instance, **kwargs):
+    membership.invalidate_result(instance.pk)
+
+
+@receiver(post_save, sender=User, weak=False)
+@receiver(post_delete, sender=User, weak=False)
+def invalidate_user_scope(sender, instance, **kwargs):
+    scopes.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile, weak=False)
+@receiver(post_delete, sender=Profile, weak=False)
+def invalidate_profile_scope(sender, instance, **kwargs):
+    scopes.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Profile, weak=False)
+@receiver(post_delete, sender=Profile, weak=False)
+def revoke_tokens_on_profile_change(sender, instance, **kwargs):
+    # Issued tokens carry the department and faculty ids
+    revoke_tokens(instance.user_id)
+
 
-        # Prepare context for email template
-        context = {
-            "system_name": "University Results System",
-            "domain": "yourdomain.edu",
-            "assessment": assessment,
-            "student": student,
-            "course": course,
-            "lecturer": lecturer,
-            "modified_by": instance.modified_by,
-            "modified_at": instance.modified_at,
-            "reason": instance.reason,
-            "changes": changes,
-            "detail_url": f"http://results/{assessment.id}/",
-        }
-
-        # Send email
-        message = BaseEmailMessage(
-            template_name="./result_system/emails/modification_message.html",
-            context=context,
+@receiver(post_save, sender=Department, weak=False)
+def revoke_department_tokens(sender, instance, created, **kwargs):
+    # The department may have moved to another faculty
+    if not created:
+        revoke_tokens(
+            *Profile.objects.filter(department=instance).values_list(
+                "user_id", flat=True
+            )
         )
-        message.send([lecturer.email])
-        print("message sent")
-    except BadHeaderError:
-        logger.warning("BadHeaderError prevented email sending")
-    except Exception as e:  # Catch all other errors
-        logger.error(f"Email failed: {str(e)}", exc_info=True)
+
+
+@receiver(post_save, sender=Course, weak=False)
+@receiver(post_delete, sender=Course, weak=False)
+@receiver(post_save, sender=Program, weak=False)
+@receiver(post_delete, sender=Program, weak=False)
+@receiver(post_save, sender=Department, weak=False)
+@receiver(post_delete, sender=Department, weak=False)
+def invalidate_all_scopes(sender, **kwargs):
+    scopes.invalidate_all()
 
 
 @receiver(post_save, sender=Result, weak=False)
-def send_result_notification(sender, instance, created, **kwargs):
-    if not created and instance.status != "A":
-        department = instance.course.program.department
-        faculty = instance.course.program.department.faculty
-        lecturer = instance.course.lecturer
-        dro = User.objects.get(is_dro=True, profile__department=department)
-        fro = User.objects.get(
-            is_fro=True,
-            profile__department=department,
-            profile__department__faculty=faculty,
+def create_assessment_for_students_in_result(sender, instance, created, **kwargs):
+    if created:
+        sync_assessments(instance)
+
+
+@receiver(post_save, sender=Result, weak=False)
+def refresh_standing_for_approved_result(sender, instance, created, **kwargs):
+    if instance.status == "A":
+        refresh_standing_after_commit(
+            Assessment.objects.filter(result=instance).values_list(
+                "student_id", flat=True
+            )
         )
 
-        #if lecturer == instance.updated_by:
-        #    status = "L_D"
-        #else:
-        status = instance.status
-
-        if status == "L_D":
-            recipient = lecturer
-        if status == "D":
-            recipient = lecturer
-        if status == "P_D":
-            recipient = dro
-        if status == "P_F":
-            recipient = fro
-
-        VERB_MAP = {
-            "D": f"{instance.updated_by} returned results for {instance.course.name}",
-            "L_D": f"You have submitted results for {instance.course.name}",
-            "P_D": f"{instance.updated_by} submitted results for {instance.course.name} to be approved",
-            "P_F": f"{instance.updated_by} submitted results for {instance.course.name} to be approved",
-        }
-
-        notify(
-            recipient=recipient,
-            actor=instance.updated_by,
-            verb=VERB_MAP.get(status),
-            target_instance=instance,
+
+@receiver(post_save, sender=User, weak=False)
+@receiver(post_delete, sender=User, weak=False)
+@receiver(post_save, sender=Profile, weak=False)
+@receiver(post_delete, sender=Profile, weak=False)
+@receiver(post_save, sender=Course, weak=False)
+@receiver(post_delete, sender=Course, weak=False)
+@receiver(post_save, sender=Program, weak=False)
+@receiver(post_delete, sender=Program, weak=False)
+@receiver(post_save, sender=Department, weak=False)
+@receiver(post_delete, sender=Department, weak=False)
+def invalidate_role_directory(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which the directory does not use
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    directory.invalidate()
+
+
+@receiver(post_save, sender=Result, weak=False)
+def send_result_notification(sender, instance, created, **kwargs):
+    if created or instance.status == "A" or instance.updated_by_id is None:
+        return
+
+    course = directory.course_info(instance.course_id)
+    if course is None:
+        # The course was deleted while the result was being saved
+        logger.warning("No course for result %s", instance.pk)
+        return
+    status = instance.status
+
+    # if lecturer == instance.updated_by:
+    #    status = "L_D"
+    if status in ("D", "R", "L_D"):
+        recipients = [course.lecturer_id]
+    elif status == "P_D":
+        recipients = directory.department_officers(course.department_id)
+    elif status == "P_F":
+        # Only the FRO registered in the course's department, not the faculty's
+        recipients = directory.department_officers(course.department_id, role="fro")
+    else:
+        recipients = []
+
+    if not recipients:
+        logger.warning(
+            "No recipient for result %s in status %s", instance.pk, status
         )
+        return
+
+    VERB_MAP = {
+        "D": f"{instance.updated_by} returned results for {course.name}",
+        "R": f"{instance.updated_by} rejected results for {course.name}",
+        "L_D": f"You have submitted results for {course.name}",
+        "P_D": f"{instance.updated_by} submitted results for {course.name} to be approved",
+        "P_F": f"{instance.updated_by} submitted results for {course.name} to be approved",
+    }
+
+    notify_many(
+        recipients,
+        actor=instance.updated_by_id,
+        verb=VERB_MAP.get(status),
+        targets=[instance],
+    )
@@ -0,0 +1,155 @@
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+
+from .grading import FAIL_GRADE, GRADE_POINTS
+from .models import Assessment, Enrollment, StudentTermSummary
+
+BATCH_SIZE = 500
+TWO_PLACES = Decimal("0.01")
+
+SUMMARY_FIELDS = [
+    "credits_attempted",
+    "credits_earned",
+    "grade_points",
+    "gpa",
+    "cumulative_credits_attempted",
+    "cumulative_credits_earned",
+    "cumulative_grade_points",
+    "cgpa",
+]
+
+
+def _average(points, credits):
+    if not credits:
+        return Decimal("0.00")
+    return (points / credits).quantize(TWO_PLACES)
+
+
+def course_terms(student_ids):
+    """Map (student_id, course_id) to the latest (academic_year, semester)"""
+    terms = {}
+    for student_id, course_id, year, semester in Enrollment.objects.filter(
+        student_id__in=student_ids
+    ).values_list("student_id", "course_id", "academic_year", "semester"):
+        key = (student_id, course_id)
+        if key not in terms or (year, semester) > terms[key]:
+            terms[key] = (year, semester)
+    return terms
+
+
+def result_term(terms, student_id, course_id, year, semester):
+    """The (academic_year, semester) a student's result counts towards.
+
+    ``year`` and ``semester`` are the result's own; the parts it leaves
+    unset come from the student's latest enrollment in the course (``terms``
+    from course_terms). None if neither knows the term.
+    """
+    if year is not None and semester:
+        return (year, semester)
+    enrolled = terms.get((student_id, course_id))
+    if enrolled is None:
+        return None
+    return (enrolled[0] if year is None else year, semester or enrolled[1])
+
+
+def build_summaries(student_ids):
+    """Compute StudentTermSummary rows for the given students (unsaved)"""
+    terms = course_terms(student_ids)
+    totals = defaultdict(lambda: [0, 0, Decimal("0")])
+    for student_id, course_id, year, semester, credit, grade in (
+        Assessment.objects.filter(
+            student_id__in=student_ids,
+            result__status="A",
+            grade__in=GRADE_POINTS.keys(),
+        ).values_list(
+            "student_id",
+            "result__course_id",
+            "result__academic_year",
+            "result__semester",
+            "result__course__credit",
+            "grade",
+        )
+    ):
+        term = result_term(terms, student_id, course_id, year, semester)
+        if term is None:
+            continue
+        total = totals[(student_id, *term)]
+        total[0] += credit
+        if grade != FAIL_GRADE:
+            total[1] += credit
+        total[2] += GRADE_POINTS[grade] * credit
+
+    summaries = []
+    cumulative = defaultdict(lambda: [0, 0, Decimal("0")])
+    for (student_id, year, semester), (attempted, earned, points) in sorted(
+        totals.items()
+    ):
+        running = cumulative[student_id]
+        running[0] += attempted
+        running[1] += earned
+        running[2] += points
+        summaries.append(
+            StudentTermSummary(
+                student_id=student_id,
+                academic_year=year,
+                semester=semester,
+                credits_attempted=attempted,
+                credits_earned=earned,
+                grade_points=points,
+                gpa=_average(points, attempted),
+                cumulative_credits_attempted=running[0],
+                cumulative_credits_earned=running[1],
+                cumulative_grade_points=running[2],
+                cgpa=_average(running[2], running[0]),
+            )
+        )
+    return summaries
+
+
+def refresh_student_standing(student_ids, batch_size=BATCH_SIZE):
+    """Recompute and upsert the term summaries of just these students.
+
+    Each batch costs two reads and one upsert, plus a key scan and delete
+    for terms that no longer have approved grades.
+    """
+    student_ids = iter(set(student_ids))
+    while batch := list(islice(student_ids, batch_size)):
+        summaries = build_summaries(batch)
+        with transaction.atomic():
+            if summaries:
+                StudentTermSummary.objects.bulk_create(
+                    summaries,
+                    update_conflicts=True,
+                    unique_fields=["student", "academic_year", "semester"],
+                    update_fields=SUMMARY_FIELDS + ["updated_at"],
+                )
+            current = {
+                (summary.student_id, summary.academic_year, summary.semester)
+                for summary in summaries
+            }
+            stale_ids = [
+                pk
+                for pk, *key in StudentTermSummary.objects.filter(
+                    student_id__in=batch
+                ).values_list("id", "student_id", "academic_year", "semester")
+                if tuple(key) not in current
+            ]
+            if stale_ids:
+                StudentTermSummary.objects.filter(id__in=stale_ids).delete()
+
+
+def refresh_standing_after_commit(student_ids):
+    """Refresh term summaries, then transcripts, once the transaction commits"""
+    from .transcripts import refresh_transcripts
+
+    student_ids = set(student_ids)
+    if student_ids:
+
+        def refresh():
+            refresh_student_standing(student_ids)
+            refresh_transcripts(student_ids)
+
+        transaction.on_commit(refresh)
@@ -0,0 +1,91 @@
+import statistics
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .grading import FAIL_GRADE, GRADE_BOUNDARIES, INCOMPLETE_GRADE
+from .models import Assessment
+
+CACHE_TIMEOUT = 60 * 60 * 24
+PERCENTILES = (10, 25, 50, 75, 90)
+GRADE_ORDER = [grade for _, grade in reversed(GRADE_BOUNDARIES)] + [
+    FAIL_GRADE,
+    INCOMPLETE_GRADE,
+]
+
+
+def _percentile(ordered, percent):
+    """Linear interpolation between closest ranks on sorted data"""
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def compute_result_stats(result_id):
+    """Summarise a result's marks from a single pass over the score column"""
+    rows = Assessment.objects.filter(result_id=result_id).values_list(
+        "total_score", "grade"
+    )
+    scores = []
+    grades = Counter()
+    for total_score, grade in rows:
+        grades[grade or INCOMPLETE_GRADE] += 1
+        if total_score is not None:
+            scores.append(float(total_score))
+    scores.sort()
+
+    stats = {
+        "count": sum(grades.values()),
+        "graded": len(scores),
+        "incomplete": grades[INCOMPLETE_GRADE],
+        "grade_distribution": {grade: grades[grade] for grade in GRADE_ORDER},
+        "mean": None,
+        "median": None,
+        "std_dev": None,
+        "min": None,
+        "max": None,
+        "percentiles": {},
+    }
+    if scores:
+        stats.update(
+            {
+                "mean": round(statistics.fmean(scores), 2),
+                "median": round(statistics.median(scores), 2),
+                "std_dev": round(statistics.pstdev(scores), 2),
+                "min": scores[0],
+                "max": scores[-1],
+                "percentiles": {
+                    f"p{p}": round(_percentile(scores, p), 2) for p in PERCENTILES
+                },
+            }
+        )
+    return stats
+
+
+def get_result_stats(result):
+    """Cached stats for a result.
+
+    The key combines Result.updated_at with the latest assessment change and
+    the assessment count, so any write to the result or its marks (including
+    added or removed assessments) produces a fresh key.
+    """
+    latest = Assessment.objects.filter(result_id=result.pk).aggregate(
+        changed=Max("updated_at"), count=Count("id")
+    )
+    key = ":".join(
+        str(part)
+        for part in (
+            "result_system:stats",
+            result.pk,
+            result.updated_at.timestamp(),
+            latest["changed"].timestamp() if latest["changed"] else 0,
+            latest["count"],
+        )
+    )
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_result_stats(result.pk)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,363 @@
+"""Deterministic synthetic institutions for load and scale testing"""
+
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from notification.models import Notification, UnreadCounter
+
+from . import directory, membership, scopes
+from .grading import compute_grade
+from .models import (
+    SEMESTER_CHOICES,
+    Assessment,
+    Course,
+    Department,
+    Enrollment,
+    Faculty,
+    Profile,
+    Program,
+    Result,
+    Student,
+)
+
+CHUNK_SIZE = 5000
+# Longest prefix that still fits "<prefix>-<n:07d>" into Student.student_id
+MAX_PREFIX_LENGTH = 12
+PASSWORD = "synthetic"
+SEMESTERS = [value for value, _ in SEMESTER_CHOICES]
+STATUSES = [value for value, _ in Result.RESULT_STATUS]
+
+
+@dataclass
+class DatasetSpec:
+    prefix: str = "SYN"
+    faculties: int = 4
+    departments_per_faculty: int = 3
+    programs_per_department: int = 2
+    courses: int = 1000
+    lecturers_per_department: int = 10
+    students: int = 10000
+    courses_per_term: int = 5
+    first_year: int = 2024
+    years: int = 2
+    notifications_per_user: int = 20
+    seed: int = 0
+    chunk_size: int = CHUNK_SIZE
+
+    @property
+    def terms(self):
+        return [
+            (year, semester)
+            for year in range(self.first_year, self.first_year + self.years)
+            for semester in SEMESTERS
+        ]
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _bulk_insert(model, rows, size):
+    count = 0
+    for chunk in _chunks(rows, size):
+        model.objects.bulk_create(chunk)
+        count += len(chunk)
+    return count
+
+
+def _mark(rng):
+    return Decimal(rng.randint(0, 2000)) / 100
+
+
+class DatasetGenerator:
+    """Bulk insert a configurable institution, chunk by chunk.
+
+    Everything derives from ``spec.seed``, so the same spec always produces
+    the same rows. Signals are bypassed (bulk_create), so assessments are
+    graded here and the role and membership caches are invalidated at the end.
+    """
+
+    def __init__(self, spec, log=None):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.log = log or (lambda message: None)
+        self.counts = {}
+
+    @property
+    def code_prefix(self):
+        # The delimiter keeps "SYN" from matching the codes of a "SYN2" dataset
+        return f"{self.spec.prefix}-"
+
+    def exists(self):
+        prefix = self.spec.prefix
+        return (
+            Faculty.objects.filter(name__istartswith=f"{prefix} Faculty ").exists()
+            or Course.objects.filter(code__startswith=self.code_prefix).exists()
+            or Student.objects.filter(student_id__startswith=self.code_prefix).exists()
+            or get_user_model()
+            .objects.filter(username__startswith=f"{prefix.lower()}_")
+            .exists()
+        )
+
+    @transaction.atomic
+    def generate(self):
+        self.create_structure()
+        self.create_staff()
+        self.create_courses()
+        self.create_students()
+        self.create_results()
+        self.create_enrollments_and_assessments()
+        self.create_notifications()
+        directory.invalidate()
+        membership.invalidate_course(*self.courses)
+        scopes.invalidate_all()
+        return self.counts
+
+    def create_structure(self):
+        spec = self.spec
+        Faculty.objects.bulk_create(
+            Faculty(name=f"{spec.prefix} Faculty {n}") for n in range(spec.faculties)
+        )
+        faculty_ids = list(
+            Faculty.objects.filter(name__startswith=f"{spec.prefix} Faculty ")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        Department.objects.bulk_create(
+            Department(
+                name=f"{spec.prefix} Department {faculty_id}.{n}",
+                faculty_id=faculty_id,
+            )
+            for faculty_id in faculty_ids
+            for n in range(spec.departments_per_faculty)
+        )
+        self.departments = list(
+            Department.objects.filter(name__startswith=f"{spec.prefix} Department ")
+            .order_by("id")
+            .values_list("id", "faculty_id")
+        )
+        Program.objects.bulk_create(
+            Program(
+                name=f"{spec.prefix} Program {department_id}.{n}",
+                department_id=department_id,
+            )
+            for department_id, _ in self.departments
+            for n in range(spec.programs_per_department)
+        )
+        self.programs = list(
+            Program.objects.filter(name__startswith=f"{spec.prefix} Program ")
+            .order_by("id")
+            .values_list("id", "department_id")
+        )
+        self.counts.update(
+            faculties=len(faculty_ids),
+            departments=len(self.departments),
+            programs=len(self.programs),
+        )
+        self.log(f"{len(self.programs)} programs")
+
+    def create_staff(self):
+        spec = self.spec
+        password = make_password(PASSWORD)
+        users = []
+        for department_id, faculty_id in self.departments:
+            for n in range(spec.lecturers_per_department):
+                users.append(
+                    (f"lecturer_{department_id}_{n}", "lecturer", department_id)
+                )
+            users.append((f"dro_{department_id}", "dro", department_id))
+        for faculty_id in sorted({faculty_id for _, faculty_id in self.departments}):
+            department_id = next(d for d, f in self.departments if f == faculty_id)
+            users.append((f"fro_{faculty_id}", "fro", department_id))
+        users.append(("co", "co", self.departments[0][0]))
+
+        prefix = spec.prefix.lower()
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(
+                username=f"{prefix}_{name}",
+                email=f"{prefix}_{name}@example.com",
+                password=password,
+                **{f"is_{role}": True},
+            )
+            for name, role, _ in users
+        )
+        user_ids = dict(
+            User.objects.filter(username__startswith=f"{prefix}_").values_list(
+                "username", "id"
+            )
+        )
+        Profile.objects.bulk_create(
+            Profile(user_id=user_ids[f"{prefix}_{name}"], department_id=department_id)
+            for name, _, department_id in users
+        )
+        self.lecturers = defaultdict(list)
+        for name, role, department_id in users:
+            if role == "lecturer":
+                self.lecturers[department_id].append(user_ids[f"{prefix}_{name}"])
+        self.staff_ids = sorted(user_ids.values())
+        self.counts["staff"] = len(users)
+        self.log(f"{len(users)} staff users (password '{PASSWORD}')")
+
+    def create_courses(self):
+        spec = self.spec
+        terms = spec.terms
+
+        def rows():
+            for n in range(spec.courses):
+                program_id, department_id = self.programs[n % len(self.programs)]
+                yield Course(
+                    code=f"{self.code_prefix}{n:05d}",
+                    name=f"{spec.prefix} Course {n}",
+                    program_id=program_id,
+                    credit=self.rng.randint(1, 3),
+                    lecturer_id=self.rng.choice(self.lecturers[department_id]),
+                )
+
+        _bulk_insert(Course, rows(), spec.chunk_size)
+        # Spread every program's courses across the terms
+        self.courses = {}
+        per_program = defaultdict(int)
+        for course_id, program_id in (
+            Course.objects.filter(code__startswith=self.code_prefix)
+            .order_by("id")
+            .values_list("id", "program_id")
+        ):
+            term = terms[per_program[program_id] % len(terms)]
+            per_program[program_id] += 1
+            self.courses[course_id] = (program_id, term)
+        self.term_courses = defaultdict(list)
+        for course_id, (program_id, term) in self.courses.items():
+            self.term_courses[(program_id, term)].append(course_id)
+        self.counts["courses"] = len(self.courses)
+        self.log(f"{len(self.courses)} courses over {len(terms)} terms")
+
+    def create_students(self):
+        spec = self.spec
+
+        def rows():
+            for n in range(spec.students):
+                yield Student(
+                    student_id=f"{self.code_prefix}{n:07d}",
+                    name=f"{spec.prefix} Student {n}",
+                    email=f"{spec.prefix.lower()}.{n}@students.example.com",
+                    program_id=self.programs[n % len(self.programs)][0],
+                    enrollment_year=spec.first_year,
+                )
+
+        self.counts["students"] = _bulk_insert(Student, rows(), spec.chunk_size)
+        self.log(f"{self.counts['students']} students")
+
+    def create_results(self):
+        # Past terms are approved; the latest term covers every workflow status
+        latest = self.spec.terms[-1]
+        rows = []
+        for n, (course_id, (_, term)) in enumerate(sorted(self.courses.items())):
+            status = STATUSES[n % len(STATUSES)] if term == latest else "A"
+            rows.append(
+                Result(
+                    course_id=course_id,
+                    status=status,
+                    academic_year=term[0],
+                    semester=term[1],
+                )
+            )
+        _bulk_insert(Result, rows, self.spec.chunk_size)
+        self.results = dict(
+            Result.objects.filter(course_id__in=self.courses).values_list(
+                "course_id", "id"
+            )
+        )
+        self.counts["results"] = len(self.results)
+
+    def create_enrollments_and_assessments(self):
+        spec = self.spec
+        students = Student.objects.filter(
+            student_id__startswith=self.code_prefix
+        ).order_by("id")
+        enrollments = assessments = 0
+        for chunk in _chunks(
+            students.values_list("id", "program_id").iterator(spec.chunk_size),
+            spec.chunk_size // spec.courses_per_term or 1,
+        ):
+            enrollment_rows = []
+            assessment_rows = []
+            for student_id, program_id in chunk:
+                for term in spec.terms:
+                    offered = self.term_courses.get((program_id, term), [])
+                    taken = self.rng.sample(
+                        offered, min(spec.courses_per_term, len(offered))
+                    )
+                    for course_id in taken:
+                        enrollment_rows.append(
+                            Enrollment(
+                                student_id=student_id,
+                                course_id=course_id,
+                                academic_year=term[0],
+                                semester=term[1],
+                            )
+                        )
+                        marks = [_mark(self.rng) for _ in range(4)]
+                        exam = Decimal(self.rng.randint(0, 6000)) / 100
+                        total, grade = compute_grade(*marks, exam)
+                        assessment_rows.append(
+                            Assessment(
+                                result_id=self.results[course_id],
+                                student_id=student_id,
+                                ca_slot1=marks[0],
+                                ca_slot2=marks[1],
+                                ca_slot3=marks[2],
+                                ca_slot4=marks[3],
+                                exam_mark=exam,
+                                total_score=total,
+                                grade=grade,
+                            )
+                        )
+            enrollments += _bulk_insert(Enrollment, enrollment_rows, spec.chunk_size)
+            assessments += _bulk_insert(Assessment, assessment_rows, spec.chunk_size)
+        self.counts.update(enrollments=enrollments, assessments=assessments)
+        self.log(f"{enrollments} enrollments, {assessments} assessments")
+
+    def create_notifications(self):
+        spec = self.spec
+        if not spec.notifications_per_user:
+            return
+        actor_id = self.staff_ids[0]
+        result_ids = sorted(self.results.values())
+        content_type = ContentType.objects.get_for_model(Result)
+        unread = defaultdict(int)
+
+        def rows():
+            for user_id in self.staff_ids:
+                for result_id in self.rng.sample(
+                    result_ids, min(spec.notifications_per_user, len(result_ids))
+                ):
+                    is_read = self.rng.random() < 0.8
+                    if not is_read:
+                        unread[user_id] += 1
+                    yield Notification(
+                        recipient_id=user_id,
+                        actor_id=actor_id,
+                        content_type=content_type,
+                        object_id=result_id,
+                        verb="synthetic",
+                        is_read=is_read,
+                    )
+
+        self.counts["notifications"] = _bulk_insert(
+            Notification, rows(), spec.chunk_size
+        )
+        UnreadCounter.objects.bulk_create(
+            UnreadCounter(user_id=user_id, unread=count)
+            for user_id, count in unread.items()
+        )
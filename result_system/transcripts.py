@@ -0,0 +1,151 @@
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .grading import INCOMPLETE_GRADE
+from .models import Assessment, Student, StudentTermSummary, TranscriptSnapshot
+from .standing import BATCH_SIZE, course_terms, result_term
+
+SUMMARY_FIELDS = (
+    "credits_attempted",
+    "credits_earned",
+    "gpa",
+    "cumulative_credits_attempted",
+    "cumulative_credits_earned",
+    "cgpa",
+)
+
+
+def _json(value):
+    # Decimals as numbers, matching the API's COERCE_DECIMAL_TO_STRING=False
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def build_transcripts(student_ids):
+    """Return {student_id: transcript data} for the given students"""
+    terms = course_terms(student_ids)
+    students = {
+        row["id"]: row
+        for row in Student.objects.filter(id__in=student_ids).values(
+            "id", "student_id", "name", "program__name", "enrollment_year"
+        )
+    }
+
+    courses = defaultdict(lambda: defaultdict(list))
+    for row in (
+        Assessment.objects.filter(student_id__in=student_ids, result__status="A")
+        .order_by("result__course__code")
+        .values(
+            "student_id",
+            "result__course_id",
+            "result__academic_year",
+            "result__semester",
+            "result__course__code",
+            "result__course__name",
+            "result__course__credit",
+            "total_score",
+            "grade",
+        )
+    ):
+        term = result_term(
+            terms,
+            row["student_id"],
+            row["result__course_id"],
+            row["result__academic_year"],
+            row["result__semester"],
+        )
+        if term is None:
+            continue
+        courses[row["student_id"]][term].append(
+            {
+                "code": row["result__course__code"],
+                "name": row["result__course__name"],
+                "credit": row["result__course__credit"],
+                "total_score": _json(row["total_score"]),
+                "grade": row["grade"] or INCOMPLETE_GRADE,
+            }
+        )
+
+    summaries = {
+        (summary["student_id"], summary["academic_year"], summary["semester"]): summary
+        for summary in StudentTermSummary.objects.filter(
+            student_id__in=student_ids
+        ).values("student_id", "academic_year", "semester", *SUMMARY_FIELDS)
+    }
+
+    transcripts = {}
+    for student_id, student in students.items():
+        student_terms = []
+        for term, term_courses in sorted(courses[student_id].items()):
+            summary = summaries.get((student_id, *term), {})
+            student_terms.append(
+                {
+                    "academic_year": term[0],
+                    "semester": term[1],
+                    "courses": term_courses,
+                    **{
+                        field: _json(summary.get(field))
+                        for field in SUMMARY_FIELDS
+                    },
+                }
+            )
+        transcripts[student_id] = {
+            "student": {
+                "id": student_id,
+                "student_id": student["student_id"],
+                "name": student["name"],
+                "program": student["program__name"],
+                "enrollment_year": student["enrollment_year"],
+            },
+            "terms": student_terms,
+            "cgpa": student_terms[-1]["cgpa"] if student_terms else None,
+        }
+    return transcripts
+
+
+def _refresh_batch(student_ids):
+    transcripts = build_transcripts(student_ids)
+    existing = {
+        snapshot.student_id: snapshot
+        for snapshot in TranscriptSnapshot.objects.filter(student_id__in=student_ids)
+    }
+    created, changed = [], []
+    now = timezone.now()
+    for student_id, data in transcripts.items():
+        snapshot = existing.get(student_id)
+        if snapshot is None:
+            created.append(TranscriptSnapshot(student_id=student_id, data=data))
+        elif snapshot.data != data:
+            snapshot.data = data
+            snapshot.version += 1
+            snapshot.generated_at = now
+            changed.append(snapshot)
+    with transaction.atomic():
+        TranscriptSnapshot.objects.bulk_create(created)
+        TranscriptSnapshot.objects.bulk_update(
+            changed, ["data", "version", "generated_at"]
+        )
+
+
+def refresh_transcripts(student_ids, batch_size=BATCH_SIZE):
+    """Regenerate snapshots; the version only moves when the content changes"""
+    student_ids = iter(set(student_ids))
+    while batch := list(islice(student_ids, batch_size)):
+        try:
+            _refresh_batch(batch)
+        except IntegrityError:
+            # A concurrent refresh (or first read) created one of the
+            # snapshots first; a second pass updates it instead
+            _refresh_batch(batch)
+
+
+def get_transcript(student):
+    """Return the student's snapshot, generating it on first request"""
+    snapshot = TranscriptSnapshot.objects.filter(student=student).first()
+    if snapshot is None:
+        refresh_transcripts([student.pk])
+        snapshot = TranscriptSnapshot.objects.get(student=student)
+    return snapshot
@@ -0,0 +1,102 @@
+import csv
+import io
+from itertools import islice
+from zipfile import BadZipFile
+
+from .grading import SCORE_FIELDS
+
+CHUNK_SIZE = 500
+# Row errors returned for a rejected sheet; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+STUDENT_COLUMN = "student_id"
+UPLOAD_COLUMNS = (STUDENT_COLUMN,) + SCORE_FIELDS
+
+
+class UploadError(Exception):
+    pass
+
+
+def _normalise_header(header):
+    return [str(name).strip().lower() if name is not None else "" for name in header]
+
+
+def _build_row(header, values):
+    row = {}
+    for name, value in zip(header, values):
+        if name not in UPLOAD_COLUMNS:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            # Empty cells leave the stored mark untouched
+            continue
+        row[name] = str(value) if name == STUDENT_COLUMN else value
+    return row
+
+
+def _iter_csv(upload):
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(stream)
+        header = _normalise_header(next(reader, []))
+        _check_header(header)
+        for row_number, values in enumerate(reader, start=2):
+            if any(values):
+                yield row_number, _build_row(header, values)
+    except UnicodeDecodeError:
+        raise UploadError("The CSV file is not UTF-8 encoded")
+    except csv.Error as e:
+        raise UploadError(f"Unreadable CSV file: {e}")
+    finally:
+        stream.detach()
+
+
+def _iter_xlsx(upload):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise UploadError("XLSX uploads require the openpyxl package")
+
+    # read_only mode streams the sheet instead of loading it into memory
+    try:
+        workbook = load_workbook(upload, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError, ValueError):
+        raise UploadError("The file is not a valid .xlsx workbook")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalise_header(next(rows, ()))
+        _check_header(header)
+        for row_number, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield row_number, _build_row(header, values)
+    except (BadZipFile, KeyError, ValueError, SyntaxError):
+        # Damaged sheet XML only surfaces once read_only mode parses it
+        raise UploadError("The file is not a valid .xlsx workbook")
+    finally:
+        workbook.close()
+
+
+def _check_header(header):
+    if STUDENT_COLUMN not in header:
+        raise UploadError(f"Missing required column '{STUDENT_COLUMN}'")
+    if not any(field in header for field in SCORE_FIELDS):
+        raise UploadError(
+            f"Expected at least one score column: {', '.join(SCORE_FIELDS)}"
+        )
+
+
+def iter_score_rows(upload):
+    """Yield (row_number, row) for every data row of a CSV or XLSX upload"""
+    name = (upload.name or "").lower()
+    if name.endswith(".csv"):
+        return _iter_csv(upload)
+    if name.endswith(".xlsx"):
+        return _iter_xlsx(upload)
+    raise UploadError("Unsupported file type, upload a .csv or .xlsx file")
+
+
+def iter_chunks(rows, size=CHUNK_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
@@ -5,6 +5,8 @@ from . import views
 router = DefaultRouter()
 router.register('courses', views.CourseViewSet, basename='course')
 router.register('submitted-results', views.ViewResultViewSet, basename='submitted-result')
+router.register('students', views.StudentViewSet, basename='student')
+router.register('modification-logs', views.ResultModificationLogViewSet, basename='modification-log')
 #router.register('results', views.ResultViewSet, basename='result')
 #router.register('assessments', views.AssessmentViewSet)
 
@@ -4,20 +4,36 @@ from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Prefetch, Q
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import DjangoModelPermissions
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ModelViewSet, ReadOnlyModelViewSet
 
+from core.dispatch import pre_bulk_update
+from core.pagination import KeysetPagination, ModifiedAtKeysetPagination
+
+from .assessments import sync_assessments as sync_result_assessments
+from .digests import queue_modification_digest
+from .exports import EXPORT_FORMATS
+from .filters import ApprovedAssessmentFilter, ResultModificationLogFilter
+from .grading import GRADED_FIELDS, SCORE_FIELDS, grade_assessments
+from .membership import is_enrolled
 from .models import (  # SubmittedResult,; SubmittedResultScore,
     Assessment,
     Course,
     Enrollment,
     Result,
     ResultModificationLog,
+    Student,
+    StudentTermSummary,
 )
 from .permissions import (
     CanCreateResult,
@@ -25,11 +41,25 @@ from .permissions import (
     IsResultDraft,
     ViewResultRoles,
 )
+from .scopes import get_user_scope
 from .serializers import (  # SubmitResultSerializer,; SubmittedResultScoreSerializer,; SubmittedResultSerializer,
     AssessmentSerializer,
     CourseSerializer,
     ResultModificationLogSerializer,
     ResultSerializer,
+    StudentSerializer,
+    StudentTermSummarySerializer,
+)
+from .standing import refresh_standing_after_commit
+from .stats import get_result_stats
+from .transcripts import get_transcript
+from .uploads import (
+    CHUNK_SIZE,
+    MAX_REPORTED_ERRORS,
+    STUDENT_COLUMN,
+    UploadError,
+    iter_chunks,
+    iter_score_rows,
 )
 
 User = get_user_model()
@@ -78,6 +108,19 @@ class ResultViewSet(ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=True, methods=["post"], url_path="sync-assessments")
+    def sync_assessments(self, request, course_pk=None, pk=None):
+        """Add assessments for late registrations and flag dropped students"""
+        result = self.get_object()
+        created, not_enrolled = sync_result_assessments(result)
+        return Response(
+            {
+                "created": len(created),
+                "not_enrolled_assessment_ids": not_enrolled,
+            },
+            status=status.HTTP_200_OK,
+        )
+
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
         return super().perform_update(serializer)
@@ -110,27 +153,41 @@ class ViewResultViewSet(
         serializer.save(updated_by=self.request.user)
 
     def get_queryset(self):
-        user = self.request.user
-        dro = user.is_dro
-        fro = user.is_fro
-        co = user.is_co
-        lecturer = user.is_lecturer
-        if dro:
-            return Result.objects.filter(
-                course__program__department=user.profile.department,
-                status="P_D",
-            )
-        elif fro:
-            return Result.objects.filter(
-                course__program__department__faculty=user.profile.department.faculty,
-                status="P_F",
+        scope = get_user_scope(self.request.user)
+        return scope.filter_results(Result.objects.order_by("id"))
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, *args, **kwargs):
+        """Score statistics and grade distribution for one result"""
+        return Response(get_result_stats(self.get_object()))
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """Stream approved assessments as CSV (default) or NDJSON"""
+        if not request.user.is_co:
+            return Response(
+                {"detail": "Only the CO can export approved results"},
+                status=status.HTTP_403_FORBIDDEN,
             )
-        elif lecturer:
-            return Result.objects.filter(
-                course__lecturer=user.id,
+        output = request.query_params.get("output", "csv")
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        elif co:
-            return Result.objects.filter(status="A")
+        filterset = ApprovedAssessmentFilter(
+            request.query_params,
+            queryset=Assessment.objects.filter(result__status="A"),
+        )
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+
+        stream, content_type = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(stream(filterset.qs), content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="approved-results.{output}"'
+        )
+        return response
 
 
 class AssessmentViewSet(
@@ -138,34 +195,21 @@ class AssessmentViewSet(
 ):
     serializer_class = AssessmentSerializer
     permission_classes = [IsResultAssessmentDraft]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         #        read_only_fields = ("id", "submitted_result_id", "student_id")
-        user = self.request.user
-        dro = user.is_dro
-        fro = user.is_fro
-        co = user.is_co
-        lecturer = user.is_lecturer
-        if dro:
-            return Assessment.objects.filter(
-                result__status="P_D",
-                result__course__program__department=user.profile.department,
-                result_id=self.kwargs.get("result_pk"),
-            )
-        elif fro:
-            return Assessment.objects.filter(
-                result__status="P_F",
-                result__course__program__department__faculty=user.profile.department.faculty,
-                result_id=self.kwargs.get("result_pk"),
-            )
-        elif co:
-            return Assessment.objects.filter(
-                result__status="A", result_id=self.kwargs.get("result_pk")
-            )
-        elif lecturer:
-            return Assessment.objects.filter(
-                result__course__lecturer=user.id, result_id=self.kwargs.get("result_pk")
-            )
+        scope = get_user_scope(self.request.user)
+        return scope.filter_results(
+            Assessment.objects.filter(result_id=self.kwargs.get("result_pk")),
+            prefix="result__",
+        )
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        instance = serializer.instance
+        if instance.result.status == "A":
+            refresh_standing_after_commit([instance.student_id])
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -239,7 +283,7 @@ class AssessmentViewSet(
 
                 self.perform_update(serializer)
 
-                ResultModificationLog.objects.create(
+                log = ResultModificationLog.objects.create(
                     assessment=instance,
                     modified_by=request.user,
                     old_data={
@@ -250,6 +294,7 @@ class AssessmentViewSet(
                     },
                     reason=request.data["correction_reason"],
                 )
+                queue_modification_digest([log])
 
                 return Response(serializer.data)
 
@@ -268,7 +313,7 @@ class AssessmentViewSet(
 
     # Bulk update for multiple scores
     @action(detail=False, methods=["patch"], url_path="bulk-update")
-    def bulk_update(self, request):
+    def bulk_update(self, request, *args, **kwargs):
         updates = request.data.get("scores", [])
         reason = request.data.get("correction_reason")
 
@@ -284,72 +329,320 @@ class AssessmentViewSet(
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Ids may arrive as numbers or numeric strings; in_bulk keys are ints
+        item_ids = [
+            self.parse_id(item.get("id")) if isinstance(item, dict) else None
+            for item in updates
+        ]
+        # One query for every targeted assessment
+        instances = (
+            self.get_queryset()
+            .select_related("result")
+            .in_bulk([item_id for item_id in item_ids if item_id is not None])
+        )
+
+        # Validate the whole payload before anything is written
         results = []
+        pending = []
+        errors = []
+        for item, item_id in zip(updates, item_ids):
+            if item_id is None:
+                raw_id = item.get("id") if isinstance(item, dict) else None
+                results.append(
+                    {
+                        "id": raw_id if isinstance(raw_id, (int, str)) else None,
+                        "status": "invalid_data",
+                    }
+                )
+                continue
+            instance = instances.get(item_id)
+            if instance is None:
+                results.append({"id": item["id"], "status": "not_found"})
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            if not serializer.is_valid():
+                errors.append({"id": instance.id, "errors": serializer.errors})
+                continue
+            changes = self.get_changes(instance, serializer.validated_data)
+            pending.append((instance, serializer.validated_data, changes))
+            if changes:
+                results.append(
+                    {
+                        "id": instance.id,
+                        "status": "updated",
+                        "changes": list(changes.keys()),
+                    }
+                )
+            else:
+                results.append({"id": instance.id, "status": "no_changes"})
+
+        changed = [
+            (instance, validated_data, changes)
+            for instance, validated_data, changes in pending
+            if changes
+        ]
+        errors.extend(
+            self.get_enrollment_errors([instance for instance, _, _ in changed])
+        )
+        if errors:
+            return Response(
+                {"detail": "Invalid score updates", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        self.save_score_changes(changed, reason)
+
+        return Response(results, status=status.HTTP_200_OK)
+
+    def parse_id(self, value):
+        """An assessment id as an int, or None when it is not a valid id"""
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    def save_score_changes(self, changed, reason=None):
+        """Apply validated changes, regrade and persist them in bulk.
+
+        ``changed`` holds (instance, validated_data, changes) triples. When a
+        reason is given, a ResultModificationLog row is written per instance.
+        """
         logs = []
+        for instance, validated_data, changes in changed:
+            for field in changes:
+                setattr(instance, field, validated_data[field])
+            if reason:
+                logs.append(
+                    ResultModificationLog(
+                        assessment=instance,
+                        modified_by=self.request.user,
+                        old_data={
+                            f: self.decimal_to_float(c["old"])
+                            for f, c in changes.items()
+                        },
+                        new_data={
+                            f: self.decimal_to_float(c["new"])
+                            for f, c in changes.items()
+                        },
+                        reason=reason,
+                    )
+                )
 
+        if not changed:
+            return
+        assessments = [instance for instance, _, _ in changed]
+        grade_assessments(assessments)
+        now = timezone.now()
+        for instance in assessments:
+            instance.updated_at = now
+        fields = SCORE_FIELDS + GRADED_FIELDS + ("updated_at",)
         with transaction.atomic():
-            for item in updates:
-                try:
-                    instance = Assessment.objects.get(id=item["id"])
-                    serializer = self.get_serializer(instance, data=item, partial=True)
-                    serializer.is_valid(raise_exception=True)
-
-                    # Track changes per score
-                    changes = self.get_changes(instance, serializer.validated_data)
-                    if changes:
-                        serializer.save()
-
-                        logs.append(
-                            ResultModificationLog(
-                                assessment=instance,
-                                modified_by=request.user,
-                                old_data={
-                                    f: self.decimal_to_float(c["old"])
-                                    for f, c in changes.items()
-                                },
-                                new_data={
-                                    f: self.decimal_to_float(c["new"])
-                                    for f, c in changes.items()
-                                },
-                                reason=reason,
-                            )
-                        )
-
-                        results.append(
-                            {
-                                "id": instance.id,
-                                "status": "updated",
-                                "changes": list(changes.keys()),
-                            }
-                        )
-                    else:
-                        results.append({"id": instance.id, "status": "no_changes"})
-                except Assessment.DoesNotExist:
-                    results.append({"id": item.get("id"), "status": "not_found"})
-                    continue
-                except KeyError:
-                    results.append({"id": item.get("id"), "status": "invalid_data"})
-                    continue
-
-            # Bulk create logs
+            pre_bulk_update.send(sender=Assessment, instances=assessments, fields=fields)
+            Assessment.objects.bulk_update(assessments, fields, batch_size=CHUNK_SIZE)
             if logs:
-                ResultModificationLog.objects.bulk_create(logs)
+                ResultModificationLog.objects.bulk_create(
+                    logs, batch_size=CHUNK_SIZE
+                )
+                queue_modification_digest(logs)
+            refresh_standing_after_commit(
+                instance.student_id
+                for instance in assessments
+                if instance.result.status == "A"
+            )
 
-        return Response(results, status=status.HTTP_200_OK)
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="upload",
+        parser_classes=[MultiPartParser],
+    )
+    def upload(self, request, *args, **kwargs):
+        """Apply a CSV/XLSX sheet of marks, matched by student_id, in chunks"""
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"detail": "Attach the score sheet as 'file'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Only the course lecturer enters marks, and only while in draft
+        result = get_object_or_404(
+            Result.objects.filter(course__lecturer=request.user.id),
+            pk=self.kwargs.get("result_pk"),
+        )
+        if result.status != "D":
+            return Response(
+                {"detail": IsResultAssessmentDraft.message},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        reason = request.data.get("correction_reason")
+        if result.submitted_at and not reason:
+            return Response(
+                {
+                    "detail": "Correction reason is required when modifying submitted scores"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # The whole sheet is validated before anything is written, so a bad
+        # row late in the file never leaves earlier rows half applied
+        summary = {
+            "processed": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "error_count": 0,
+            "errors": [],
+        }
+        seen = set()
+        changed = []
+        try:
+            for chunk in iter_chunks(iter_score_rows(upload)):
+                chunk_changes = self.validate_score_rows(result, chunk, summary, seen)
+                # Nothing is saved once a row fails, so stop holding changes
+                if summary["error_count"]:
+                    changed = []
+                else:
+                    changed.extend(chunk_changes)
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if summary["error_count"]:
+            return Response(
+                {
+                    "detail": "Invalid rows, no scores were saved",
+                    "processed": summary["processed"],
+                    "error_count": summary["error_count"],
+                    "errors": summary["errors"],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        self.save_score_changes(changed, reason)
+        return Response(summary, status=status.HTTP_200_OK)
+
+    def validate_score_rows(self, result, rows, summary, seen):
+        """Validate one chunk of uploaded rows and return the pending changes"""
+        student_ids = {row[STUDENT_COLUMN] for _, row in rows if STUDENT_COLUMN in row}
+        instances = {}
+        for assessment in Assessment.objects.filter(
+            result=result, student__student_id__in=student_ids
+        ).select_related("student"):
+            assessment.result = result
+            instances[assessment.student.student_id] = assessment
+
+        changed = []
+        for row_number, row in rows:
+            summary["processed"] += 1
+            student_id = row.get(STUDENT_COLUMN)
+            error = None
+            if not student_id:
+                error = ["Missing student_id"]
+            elif student_id in seen:
+                error = ["Duplicate row for this student"]
+            elif student_id not in instances:
+                error = ["No assessment for this student in the result"]
+            if error:
+                self.add_row_error(summary, row_number, student_id, error)
+                continue
+            seen.add(student_id)
+
+            instance = instances[student_id]
+            serializer = self.get_serializer(instance, data=row, partial=True)
+            if not serializer.is_valid():
+                self.add_row_error(summary, row_number, student_id, serializer.errors)
+                continue
+            if not is_enrolled(instance.student_id, instance.result.course_id):
+                self.add_row_error(
+                    summary,
+                    row_number,
+                    student_id,
+                    ["Student is not enrolled in this course"],
+                )
+                continue
+            changes = self.get_changes(instance, serializer.validated_data)
+            if changes:
+                changed.append((instance, serializer.validated_data, changes))
+                summary["updated"] += 1
+            else:
+                summary["unchanged"] += 1
+        return changed
+
+    def add_row_error(self, summary, row_number, student_id, errors):
+        """Count a row error, keeping the first MAX_REPORTED_ERRORS in full"""
+        summary["error_count"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append(
+                {"row": row_number, "student_id": student_id, "errors": errors}
+            )
+
+    def get_enrollment_errors(self, assessments):
+        """Check enrollment against the cached per-course membership sets"""
+        return [
+            {
+                "id": assessment.id,
+                "errors": ["Student is not enrolled in this course"],
+            }
+            for assessment in assessments
+            if not is_enrolled(assessment.student_id, assessment.result.course_id)
+        ]
+
+
+class StudentViewSet(ReadOnlyModelViewSet):
+    serializer_class = StudentSerializer
+
+    def get_queryset(self):
+        scope = get_user_scope(self.request.user)
+        return scope.filter_students(Student.objects.order_by("id"))
+
+    @action(detail=True, methods=["get"])
+    def standing(self, request, *args, **kwargs):
+        """Current CGPA and per-term GPA from the materialized summaries"""
+        student = self.get_object()
+        terms = StudentTermSummary.objects.filter(student=student).order_by(
+            "academic_year", "semester"
+        )
+        data = StudentTermSummarySerializer(terms, many=True).data
+        return Response(
+            {
+                "student": StudentSerializer(student).data,
+                "current": data[-1] if data else None,
+                "terms": data,
+            }
+        )
+
+    @action(detail=True, methods=["get"])
+    def transcript(self, request, *args, **kwargs):
+        """Serve the student's precomputed transcript snapshot"""
+        snapshot = get_transcript(self.get_object())
+        etag = f'"{snapshot.student_id}-{snapshot.version}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(
+            {
+                **snapshot.data,
+                "version": snapshot.version,
+                "generated_at": snapshot.generated_at,
+            },
+            headers={"ETag": etag},
+        )
 
 
 class ResultModificationLogViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+    """Score corrections, newest first, within the courses the user oversees"""
+
     serializer_class = ResultModificationLogSerializer
-    queryset = ResultModificationLog.objects.all().select_related(
-        "modified_by", "assessment", "submitted_result_score__student"
-    )
+    pagination_class = ModifiedAtKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ResultModificationLogFilter
 
-    # filter_backends = [DjangoFilterBackend]
-    # filterset_fields = [
-    #    'submitted_result_score__id',
-    #    'modified_by__id',
-    #    'submitted_result_score__student__id'
-    # ]
+    def get_queryset(self):
+        return get_user_scope(self.request.user).filter_courses(
+            ResultModificationLog.objects.select_related(
+                "modified_by", "assessment__student", "assessment__result__course"
+            ),
+            prefix="assessment__result__course__",
+        )
 
 
 # Create your views here.